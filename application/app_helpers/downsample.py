@@ -0,0 +1,53 @@
+import numpy as np
+
+
+def min_max(y, max_points):
+    # Indices of the min and max of each bucket, so every peak and trough survives exactly
+    n = len(y)
+    if n <= max_points:
+        return np.arange(n)
+    n_buckets = max(max_points // 2, 1)
+    size = -(-n // n_buckets)
+    padded = np.full(n_buckets * size, np.nan)
+    padded[:n] = y
+    buckets = padded.reshape(n_buckets, size)
+    valid = ~np.all(np.isnan(buckets), axis=1)
+    offsets = np.arange(n_buckets)[valid] * size
+    lows = np.argmin(np.where(np.isnan(buckets[valid]), np.inf, buckets[valid]), axis=1) + offsets
+    highs = np.argmax(np.where(np.isnan(buckets[valid]), -np.inf, buckets[valid]), axis=1) + offsets
+    return np.unique(np.concatenate(([0], lows, highs, [n - 1])))
+
+
+def lttb(x, y, max_points):
+    # Largest-Triangle-Three-Buckets, plus the global extremes so the peaks stay exact
+    n = len(y)
+    if n <= max_points or max_points < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=np.float64)
+    filled = np.where(np.isnan(y), np.nanmean(y) if not np.all(np.isnan(y)) else 0.0, y)
+    edges = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    indices = np.empty(max_points, dtype=np.int64)
+    indices[0], indices[-1] = 0, n - 1
+    selected = 0
+    for i in range(max_points - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+        # Average of the next bucket; the last bucket looks ahead to the final point
+        if i + 2 < len(edges):
+            following = slice(edges[i + 1], max(edges[i + 2], edges[i + 1] + 1))
+        else:
+            following = slice(n - 1, n)
+        avg_x, avg_y = x[following].mean(), filled[following].mean()
+        area = np.abs((x[selected] - avg_x) * (filled[start:end] - filled[selected])
+                      - (x[selected] - x[start:end]) * (avg_y - filled[selected]))
+        selected = start + int(np.argmax(area))
+        indices[i + 1] = selected
+    if not np.all(np.isnan(y)):
+        indices = np.concatenate((indices, [np.nanargmin(y), np.nanargmax(y)]))
+    return np.unique(indices)
+
+
+def downsample(x, y, max_points, method="minmax"):
+    # Indices to keep for at most roughly max_points points of (x, y)
+    if method == "lttb":
+        return lttb(x, y, max_points)
+    return min_max(y, max_points)
@@ -0,0 +1,151 @@
+import argparse
+import io
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlparse
+
+import boto3
+import pyarrow as pa
+import pyarrow.parquet as pq
+from botocore.exceptions import ClientError
+
+
+def s3_client_from_env(region_name="eu-west-1"):
+    # S3_ENDPOINT_URL points the export at a local S3 stand-in (MinIO, moto server, ...)
+    return boto3.client("s3", region_name=region_name, endpoint_url=os.environ.get("S3_ENDPOINT_URL"))
+
+
+def split_s3_url(url):
+    parsed = urlparse(url)
+    return parsed.netloc, parsed.path.lstrip("/")
+
+
+def unload_query(database_name, table_name, start, end, s3_url):
+    # Long format keeps the UNLOAD cheap; pivoting happens on the local dataset
+    return f"""
+        UNLOAD (
+            SELECT time, measure_name, measure_value::double AS value
+            FROM "{database_name}"."{table_name}"
+            WHERE time BETWEEN from_iso8601_timestamp('{start.isoformat()}')
+                           AND from_iso8601_timestamp('{end.isoformat()}')
+              AND measure_value::double IS NOT NULL
+            ORDER BY time
+        )
+        TO '{s3_url}'
+        WITH (format = 'PARQUET')
+    """
+
+
+def run_unload(query_client, database_name, table_name, start, end, s3_url):
+    # Returns the manifest S3 url written by Timestream, or None on failure
+    try:
+        paginator = query_client.get_paginator("query")
+        for response in paginator.paginate(QueryString=unload_query(database_name, table_name, start, end, s3_url)):
+            columns = [col["Name"] for col in response["ColumnInfo"]]
+            for row in response["Rows"]:
+                result = dict(zip(columns, [datum.get("ScalarValue") for datum in row["Data"]]))
+                print(f"Unloaded {result.get('rows')} rows to {s3_url}")
+                return result.get("manifestFile")
+    except ClientError as e:
+        print(f"Error unloading data: {e}")
+    return None
+
+
+def list_result_files(s3_client, manifest_url=None, prefix_url=None):
+    # The manifest is the source of truth. Without one, take every object UNLOAD writes under
+    # <prefix>results/ (data files need not carry a .parquet suffix); the manifest and metadata
+    # files sit at the prefix root and are left out.
+    if manifest_url:
+        bucket, key = split_s3_url(manifest_url)
+        manifest = json.loads(s3_client.get_object(Bucket=bucket, Key=key)["Body"].read())
+        return [entry["url"] for entry in manifest["result_files"]]
+    bucket, prefix = split_s3_url(prefix_url)
+    results_prefix = f"{prefix.rstrip('/')}/results/" if prefix else "results/"
+    urls = []
+    for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=bucket, Prefix=results_prefix):
+        urls += [f"s3://{bucket}/{obj['Key']}" for obj in page.get("Contents", [])
+                 if not obj["Key"].endswith("/") and obj["Size"]]
+    return sorted(urls)
+
+
+def download_partition(s3_client, url):
+    bucket, key = split_s3_url(url)
+    body = s3_client.get_object(Bucket=bucket, Key=key)["Body"].read()
+    return pq.read_table(io.BytesIO(body))
+
+
+def download_partitions(s3_client, urls, max_workers=8):
+    # boto3 clients are thread safe, so one client serves every download thread
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        tables = list(executor.map(lambda url: download_partition(s3_client, url), urls))
+    tables = [table for table in tables if table.num_rows]
+    if not tables:
+        return None
+    return pa.concat_tables(tables, promote_options="default")
+
+
+def to_wide_frame(table):
+    # Same shape as query_last_days: time index, one column per measure
+    df = table.to_pandas()
+    df = df.pivot_table(index="time", columns="measure_name", values="value", aggfunc="first")
+    return df.sort_index()
+
+
+def export_history(query_client, s3_client, database_name, table_name, start, end, s3_url, out_path,
+                   max_workers=8, wide=False, allow_partial=False):
+    # Returns the exported table, or None when nothing (complete) could be exported
+    manifest_url = run_unload(query_client, database_name, table_name, start, end, s3_url)
+    if manifest_url is None and not allow_partial:
+        print(f"UNLOAD to {s3_url} did not finish; nothing written (--allow-partial keeps what reached S3)")
+        return None
+    if manifest_url is None:
+        print(f"WARNING: UNLOAD to {s3_url} did not finish; salvaging the partitions under its prefix. "
+              f"'{out_path}' will be INCOMPLETE.")
+    urls = list_result_files(s3_client, manifest_url, s3_url)
+    table = download_partitions(s3_client, urls, max_workers) if urls else None
+    if table is None:
+        print("No data exported.")
+        return None
+    if wide:
+        to_wide_frame(table).to_parquet(out_path)
+    else:
+        pq.write_table(table, out_path)
+    if manifest_url is None:
+        print(f"WARNING: exported {table.num_rows} rows from {len(urls)} partial partitions to '{out_path}'; "
+              f"the dataset is INCOMPLETE.")
+    else:
+        print(f"Exported {table.num_rows} rows to '{out_path}'.")
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export Timestream history to a local Parquet dataset")
+    parser.add_argument("--database", default="my-timestream-database")
+    parser.add_argument("--table", default="TestTable")
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--s3-url", required=True, help="s3://bucket/prefix/ for the UNLOAD results")
+    parser.add_argument("--out", default="history.parquet")
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--wide", action="store_true", help="write one column per measure, like query_last_days")
+    parser.add_argument("--allow-partial", action="store_true",
+                        help="if UNLOAD fails, still write the partitions it left in S3 (incomplete data)")
+    parser.add_argument("--region", default="eu-west-1")
+    args = parser.parse_args()
+
+    end = datetime.now(timezone.utc).replace(tzinfo=None)
+    start = end - timedelta(days=args.days)
+    # Every run gets its own folder so partitions from earlier exports are never mixed in
+    s3_url = f"{args.s3_url.rstrip('/')}/{end.strftime('%Y%m%dT%H%M%S')}/"
+
+    query_client = boto3.client("timestream-query", region_name=args.region)
+    table = export_history(query_client, s3_client_from_env(args.region), args.database, args.table, start, end,
+                           s3_url, args.out, args.workers, args.wide, args.allow_partial)
+    if table is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
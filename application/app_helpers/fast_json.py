@@ -0,0 +1,73 @@
+import decimal
+
+import numpy as np
+import pandas as pd
+import plotly.io.json
+
+try:
+    import orjson
+except ImportError:  # install() then leaves plotly's encoder in place
+    orjson = None
+
+# Response encoder for Dash: orjson writes NumPy arrays, datetime64 and NaN natively (as fragments from the
+# default hook, so NaT can be caught first), and the hook covers the rest (components, Patch, pandas
+# objects) so nothing falls back to plotly's recursive clean-up.
+
+# Only what could close a <script> block or break a JS string literal is escaped. plotly also escapes
+# every "/" and ">", which bloats the base64 trace buffers by several percent.
+UNSAFE = (("<", "\\u003c"), ("\u2028", "\\u2028"), ("\u2029", "\\u2029"))
+
+
+def numpy_fragment(values):
+    # NumPy data written by orjson straight from the buffer, embedded verbatim in the surrounding document
+    return orjson.Fragment(orjson.dumps(values, option=orjson.OPT_SERIALIZE_NUMPY))
+
+
+def default(obj):
+    if hasattr(obj, "to_plotly_json"):  # Dash components, Patch, plotly graph objects
+        return obj.to_plotly_json()
+    if isinstance(obj, (pd.Series, pd.Index)):
+        obj = obj.to_numpy()
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind == "M" and np.isnat(obj).any():
+            # orjson writes NaT as a 1677 date or refuses it, depending on the unit
+            return np.where(np.isnat(obj), None, np.datetime_as_string(obj)).tolist()
+        if obj.dtype.kind in "biufM":
+            return numpy_fragment(np.ascontiguousarray(obj))
+        return obj.tolist()  # object and string arrays
+    if isinstance(obj, np.datetime64):
+        return None if np.isnat(obj) else numpy_fragment(obj)
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if obj is pd.NaT or obj is pd.NA:
+        return None
+    if isinstance(obj, decimal.Decimal):
+        return float(obj)
+    if hasattr(obj, "isoformat"):  # pd.Timestamp and other datetime subclasses
+        return obj.isoformat()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def dumps(obj):
+    # Without OPT_SERIALIZE_NUMPY every array reaches default, which is where NaT is caught
+    out = orjson.dumps(obj, default=default, option=orjson.OPT_NON_STR_KEYS).decode()
+    for unsafe, safe in UNSAFE:
+        if unsafe in out:
+            out = out.replace(unsafe, safe)
+    return out
+
+
+def install():
+    # Dash looks up plotly.io.json.to_json_plotly for every callback response, the layout and the config,
+    # so pointing it here covers all of them. Pretty printing and an explicit engine keep plotly's encoder.
+    if orjson is None or getattr(plotly.io.json.to_json_plotly, "fast_json", False):
+        return
+    plotly_encoder = plotly.io.json.to_json_plotly
+
+    def to_json_plotly(plotly_object, pretty=False, engine=None):
+        if pretty or engine is not None:
+            return plotly_encoder(plotly_object, pretty, engine)
+        return dumps(plotly_object)
+
+    to_json_plotly.fast_json = True
+    plotly.io.json.to_json_plotly = to_json_plotly
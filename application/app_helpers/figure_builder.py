@@ -0,0 +1,208 @@
+import base64
+import functools
+
+import numpy as np
+import pandas as pd
+import plotly.graph_objects as go
+from dash import Patch
+
+from app_helpers import time_axis
+from app_helpers.downsample import downsample
+
+
+def column_options(df):
+    return [{'label': col.lower(), 'value': col} for col in df.select_dtypes(include=[np.number]).columns]
+
+
+def epoch_ms(index):
+    # Date axes take epoch milliseconds as well as date strings, and numbers can travel as a binary buffer
+    return index.to_numpy().astype('datetime64[ms]').astype(np.int64)
+
+
+def typed_array(values):
+    # plotly.js typed-array spec: dtype plus the raw little-endian float64 buffer, base64 encoded
+    values = np.ascontiguousarray(values, dtype='<f8')
+    return {'dtype': 'f8', 'bdata': base64.b64encode(values).decode('ascii')}
+
+
+def x_coordinates(index):
+    # x0/dx when the times are an unbroken cadence, explicit epoch milliseconds otherwise
+    x = epoch_ms(index)
+    axis = time_axis.encode(x)
+    if time_axis.is_regular(axis):
+        return {'x0': axis['start'], 'dx': axis['step']}
+    return {'x': typed_array(x)}
+
+
+def time_values(index):
+    # Clientside trace payloads: the cadence encoding when it fits, decoded by dashboard.decodeTimeAxis
+    x = epoch_ms(index)
+    return time_axis.encode(x) or typed_array(x)
+
+
+def figure_points(df, selected_columns, max_points=None):
+    # Points the browser will draw once every selected trace is downsampled to max_points
+    per_trace = min(len(df), max_points) if max_points else len(df)
+    return per_trace * len(selected_columns or [])
+
+
+def use_webgl(df, selected_columns, max_points=None, threshold=None):
+    # SVG gets sluggish past a few tens of thousands of points; WebGL keeps panning smooth
+    return threshold is not None and figure_points(df, selected_columns, max_points) > threshold
+
+
+@functools.lru_cache(maxsize=None)
+def layout_template(theme="plotly"):
+    # Layout shared by every figure, resolved through plotly once per theme. Callers copy it, never mutate it.
+    fig = go.Figure()
+    fig.update_layout(
+        template=theme,
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=40, r=40, t=60, b=60, pad=0),
+        showlegend=True
+    )
+    return fig.to_plotly_json()['layout']
+
+
+def build_trace(df, col, axis, max_points=None, method="minmax", webgl=False):
+    # Plain trace dict in the form go.Scatter would serialise to, without its per-property validation
+    x, y = df.index, df[col].to_numpy()
+    if max_points and len(y) > max_points:
+        keep = downsample(x.asi8, y, max_points, method)
+        x, y = x[keep], y[keep]
+    return {'mode': 'lines', 'name': col, **x_coordinates(x), 'y': typed_array(y),
+            'yaxis': 'y' if axis == 1 else f'y{axis}', 'type': 'scattergl' if webgl else 'scatter'}
+
+
+def build_yaxis(col, axis):
+    # The first axis is the anchor; every other one overlays it and shifts itself out of the way
+    if axis == 1:
+        return {'title': {'text': col}}
+    return {'title': {'text': col}, 'anchor': 'free', 'overlaying': 'y', 'autoshift': True}
+
+
+def build_xaxis(x_range=None):
+    xaxis = {'title': {'text': "Datetime"}, 'type': 'date'}
+    if x_range:
+        xaxis['range'] = x_range
+    return xaxis
+
+
+def build_figure(df, selected_columns, theme="plotly", max_points=None, x_range=None, method="minmax",
+                 webgl=False):
+    # Figure dict straight from the arrays and the precompiled layout (benchmarks/bench_figure.py)
+    layout = dict(layout_template(theme))
+    data = []
+    if selected_columns:
+        for i, col in enumerate(selected_columns):
+            data.append(build_trace(df, col, i + 1, max_points, method, webgl))
+            layout['yaxis' if i == 0 else f'yaxis{i + 1}'] = build_yaxis(col, i + 1)
+        layout['xaxis'] = build_xaxis(x_range)
+    return {'data': data, 'layout': layout}
+
+
+def default_axes(selected_columns):
+    # Axis number per column as laid out by build_figure
+    return {col: i + 1 for i, col in enumerate(selected_columns or [])}
+
+
+def patch_columns(df, previous_columns, selected_columns, axes, max_points=None, method="minmax", webgl=False):
+    # Partial figure update for one added or removed column, or None when a full rebuild is needed.
+    # Traces stay in selection order; each column keeps its axis number until it is removed.
+    if not previous_columns or not selected_columns:
+        return None
+    added = [col for col in selected_columns if col not in previous_columns]
+    removed = [col for col in previous_columns if col not in selected_columns]
+    if len(added) + len(removed) != 1:
+        return None
+
+    patch = Patch()
+    axes = dict(axes)
+    if added:
+        col = added[0]
+        if selected_columns != previous_columns + added:
+            return None
+        axis = min(set(range(2, len(axes) + 3)) - set(axes.values()))
+        patch['data'].append(build_trace(df, col, axis, max_points, method, webgl))
+        patch['layout'][f'yaxis{axis}'] = build_yaxis(col, axis)
+        axes[col] = axis
+    else:
+        col = removed[0]
+        # Every other axis overlays the first one, so losing it means laying the figure out again
+        if axes.get(col, 1) == 1 or [c for c in previous_columns if c != col] != selected_columns:
+            return None
+        del patch['data'][previous_columns.index(col)]
+        del patch['layout'][f'yaxis{axes.pop(col)}']
+    return patch, axes
+
+
+def relayout_range(relayout_data):
+    # x range from a zoom/pan relayout event: a [start, end] pair, 'reset' for autorange, or None if x is untouched
+    if not relayout_data:
+        return None
+    if relayout_data.get('xaxis.autorange'):
+        return 'reset'
+    if 'xaxis.range[0]' in relayout_data and 'xaxis.range[1]' in relayout_data:
+        return [relayout_data['xaxis.range[0]'], relayout_data['xaxis.range[1]']]
+    if 'xaxis.range' in relayout_data:
+        return list(relayout_data['xaxis.range'])
+    return None
+
+
+def view_slice(df, x_range):
+    # Rows inside the visible range plus one on either side, so lines run to the plot edges
+    if not x_range:
+        return df
+    start = df.index.searchsorted(pd.Timestamp(x_range[0]))
+    end = df.index.searchsorted(pd.Timestamp(x_range[1]), side='right')
+    return df.iloc[max(start - 1, 0):min(end + 1, len(df))]
+
+
+def appended_rows(previous, current, columns):
+    # Rows of current after previous ends, or None when current does more than append to previous
+    if any(col not in previous.columns or col not in current.columns for col in columns) or previous.empty:
+        return None
+    last_time = previous.index[-1]
+    if current.empty or current.index[-1] <= last_time:
+        return None
+    # Rows may roll off the front of the window, but the rest has to match exactly
+    kept = current.index[current.index <= last_time]
+    overlap = previous.index[previous.index >= current.index[0]]
+    if not kept.equals(overlap):
+        return None
+    if not np.array_equal(previous.loc[overlap, columns].to_numpy(), current.loc[overlap, columns].to_numpy(),
+                          equal_nan=True):
+        return None
+    return current.loc[current.index > last_time, columns]
+
+
+def extend_data(rows, columns, max_points=None):
+    # dcc.Graph extendData: new points per trace, keeping at most max_points so old ones roll off.
+    # Plain arrays here; dashboard.extendFigure turns them into the typed arrays the traces hold.
+    x = epoch_ms(rows.index)
+    update = [{'x': [x] * len(columns), 'y': [rows[col].to_numpy() for col in columns]}, list(range(len(columns)))]
+    return update + [max_points] if max_points else update
+
+
+def base_layout(theme="plotly"):
+    # Layout every figure starts from before y axes are added, as plain JSON for clientside rendering
+    return dict(layout_template(theme), xaxis=build_xaxis())
+
+
+def trace_payload(df, version, theme="plotly", webgl_threshold=None):
+    # Every candidate trace at once, so the browser can switch columns without a server round trip
+    numeric = df.select_dtypes(include=[np.number])
+    return {
+        'version': version, 'full': True, 'max_points': len(df), 'layout': base_layout(theme),
+        'webgl_threshold': webgl_threshold,
+        'x': time_values(df.index), 'y': {col: typed_array(numeric[col]) for col in numeric.columns}
+    }
+
+
+def trace_delta(rows, version, max_points, previous):
+    # Trailing rows for every candidate trace, merged by dashboard.mergeTraces into a copy at version previous
+    return {
+        'version': version, 'previous': previous, 'full': False, 'max_points': max_points,
+        'x': time_values(rows.index), 'y': {col: typed_array(rows[col]) for col in rows.columns}
+    }
@@ -0,0 +1,68 @@
+import json
+import threading
+from collections import OrderedDict
+
+import plotly.io as pio
+
+from app_helpers import fast_json
+
+try:
+    import orjson
+except ImportError:  # still works without orjson, but a hit costs a json.loads
+    orjson = None
+
+
+class FigureCache:
+    # Encoded figure JSON per (snapshot version, columns, range, width), least recently used evicted by bytes
+
+    def __init__(self, max_bytes=32 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> encoded figure bytes
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(version, columns, x_range, width):
+        return version, tuple(columns or ()), tuple(x_range) if x_range else None, width
+
+    def encoded(self, key, build):
+        # Encoded JSON for key, calling build() for the figure only on a miss
+        with self._lock:
+            encoded = self._entries.get(key)
+            if encoded is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return encoded
+            self.misses += 1
+        encoded = encode_figure(build())
+        if len(encoded) <= self.max_bytes:
+            with self._lock:
+                previous = self._entries.pop(key, None)
+                if previous is not None:
+                    self._size -= len(previous)
+                self._entries[key] = encoded
+                self._size += len(encoded)
+                while self._size > self.max_bytes:
+                    _, evicted = self._entries.popitem(last=False)
+                    self._size -= len(evicted)
+        return encoded
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'bytes': self._size, 'hits': self.hits, 'misses': self.misses}
+
+
+def encode_figure(fig):
+    if orjson is not None:
+        return fast_json.dumps(fig).encode()
+    return pio.to_json(fig, validate=False).encode()
+
+
+def encoded_figure(encoded):
+    # Callback output for encoded figure JSON. orjson embeds a Fragment verbatim when Dash serialises the
+    # response, so a hit is never re-encoded.
+    if orjson is not None and hasattr(orjson, "Fragment"):
+        return orjson.Fragment(encoded)
+    return json.loads(encoded)
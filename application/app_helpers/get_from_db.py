@@ -1,4 +1,5 @@
 import boto3
+import numpy as np
 import pandas as pd
 from botocore.exceptions import ClientError
 pd.set_option('display.max_columns', None)
@@ -31,7 +32,7 @@ def query_last_days(client, database_name, table_name, days):
                 columns = [col["Name"] for col in response["ColumnInfo"]]
             for row in response["Rows"]:
                 rows.append([
-                    datum.get("ScalarValue") for datum in row["Data"]
+                    parse_datum(datum) for datum in row["Data"]
                 ])
 
         if columns and rows:
@@ -51,6 +52,91 @@ def query_last_days(client, database_name, table_name, days):
         return None
 
 
+def parse_datum(datum):
+    # Decode any Timestream datum, not only scalars
+    if datum.get("NullValue"):
+        return None
+    if "ScalarValue" in datum:
+        return datum["ScalarValue"]
+    if "TimeSeriesValue" in datum:
+        return [(point["Time"], parse_datum(point["Value"])) for point in datum["TimeSeriesValue"]]
+    if "ArrayValue" in datum:
+        return [parse_datum(item) for item in datum["ArrayValue"]]
+    if "RowValue" in datum:
+        return [parse_datum(item) for item in datum["RowValue"]["Data"]]
+    return None
+
+
+def parse_time_series(datum):
+    # Decode a TimeSeriesValue datum straight into contiguous time and value arrays
+    points = datum.get("TimeSeriesValue") or []
+    times = np.array([point["Time"] for point in points], dtype="datetime64[ns]")
+    values = np.fromiter(
+        (np.nan if point["Value"].get("NullValue") else point["Value"]["ScalarValue"] for point in points),
+        dtype=np.float64, count=len(points)
+    )
+    return times, values
+
+
+def query_last_days_series(client, database_name, table_name, days):
+    total_ms = days * 86400000
+    # One row per measure, with the whole window packed into a single time series column.
+    # DOUBLE measures only; query_last_days still covers every measure_value type.
+    query = f"""
+        WITH last_record_time AS (
+            SELECT MAX(time) AS last_time
+            FROM "{database_name}"."{table_name}"
+        )
+        SELECT measure_name, CREATE_TIME_SERIES(time, measure_value::double) AS series
+        FROM "{database_name}"."{table_name}"
+        WHERE time BETWEEN TIMESTAMPADD('MILLISECOND', -{total_ms}, (SELECT last_time FROM last_record_time))
+                       AND (SELECT last_time FROM last_record_time)
+          AND measure_value::double IS NOT NULL
+        GROUP BY measure_name
+    """
+
+    try:
+        paginator = client.get_paginator("query")
+        response_iterator = paginator.paginate(QueryString=query)
+
+        series = {}
+        columns = None
+
+        for response in response_iterator:
+            if "ColumnInfo" in response and not columns:
+                columns = [col["Name"] for col in response["ColumnInfo"]]
+            for row in response["Rows"]:
+                data = dict(zip(columns, row["Data"]))
+                times, values = parse_time_series(data["series"])
+                order = np.argsort(times, kind="stable")
+                series[data["measure_name"]["ScalarValue"]] = (times[order], values[order])
+
+        if series:
+            return series
+        else:
+            print("No data retrieved.")
+            return None
+
+    except ClientError as e:
+        print(f"Error querying data: {e}")
+        return None
+
+
+def series_to_frame(series):
+    # Align per-measure arrays on a shared time index, same shape as query_last_days
+    if not series:
+        return None
+    index = np.unique(np.concatenate([times for times, _ in series.values()]))
+    data = {}
+    for name, (times, values) in series.items():
+        column = np.full(len(index), np.nan)
+        column[np.searchsorted(index, times)] = values
+        data[name] = column
+    df = pd.DataFrame(data, index=pd.DatetimeIndex(index, name="time"))
+    df.columns.name = "measure_name"
+    return df.reindex(columns=sorted(df.columns))
+
+
 def main():
     database_name = "my-timestream-database"  # Replace with your Timestream database name
     table_name = "TestTable"  # Replace with your desired table name
@@ -70,9 +156,9 @@ def main():
         print(df.iloc[0])
         print("\nDataframe last value:")
         print(df.iloc[-1])
-        # Optionally save to a file
-        df.to_csv("last_day_data.csv", index=False)
-        print("Data saved to 'last_day_data.csv'.")
+        # Optionally save to a file; longer ranges go through app_helpers.export_history (UNLOAD to Parquet)
+        df.to_parquet("last_day_data.parquet")
+        print("Data saved to 'last_day_data.parquet'.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,37 @@
+import hashlib
+import json
+
+from flask import Response, request
+
+# Strong ETags for the read endpoints. A client that sends its tag back in If-None-Match gets an empty
+# 304 while the snapshot (and view) it holds is still current, and the body is never built.
+
+
+def etag_for(*parts):
+    # Same parts, same tag in every worker and task
+    return hashlib.blake2b(json.dumps(parts, separators=(",", ":")).encode(), digest_size=12).hexdigest()
+
+
+def matching_tag(etag):
+    # The tag the client sent for etag, if any. flask-compress turns a strong tag into "<tag>:<encoding>"
+    # on compressed responses, so that form matches too.
+    if request.if_none_match.star_tag:
+        return etag
+    for tag in request.if_none_match:
+        if tag == etag or tag.startswith(etag + ":"):
+            return tag
+    return None
+
+
+def conditional_json(etag, body):
+    # body() only runs when the client's copy is missing or stale
+    tag = matching_tag(etag)
+    if tag is not None:
+        response = Response(status=304)
+        response.set_etag(tag)
+    else:
+        response = Response(body(), mimetype="application/json")
+        response.set_etag(etag)
+    # Always revalidate: a version can change at any poll
+    response.headers["Cache-Control"] = "no-cache"
+    return response
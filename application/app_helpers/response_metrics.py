@@ -0,0 +1,62 @@
+import threading
+
+from flask import jsonify, request
+
+# Response sizes before and after compression, per route kind, counted by each worker since it started
+
+
+def route_kind(path):
+    if path.startswith("/_dash-update-component"):
+        return "callback"
+    if path.startswith("/_dash-layout"):
+        return "layout"
+    if path.startswith("/assets/") or path.startswith("/_dash-component-suites/"):
+        return "assets"
+    if path == "/":
+        return "index"
+    return "other"
+
+
+class ResponseMetrics:
+
+    def __init__(self):
+        self._counters = {}
+        self._lock = threading.Lock()
+
+    def _add(self, kind, **amounts):
+        with self._lock:
+            counters = self._counters.setdefault(
+                kind, {"responses": 0, "compressed": 0, "raw_bytes": 0, "sent_bytes": 0})
+            for name, amount in amounts.items():
+                counters[name] += amount
+
+    def record_raw(self, response):
+        # Register after Compress so it runs before compression (Flask runs after_request hooks in reverse)
+        request.environ["metrics.raw_bytes"] = response.content_length
+        return response
+
+    def record_sent(self, response):
+        # Register before Compress so it sees the body that actually goes out
+        kind = route_kind(request.path)
+        raw = request.environ.get("metrics.raw_bytes")
+        compressed = int("Content-Encoding" in response.headers)
+        if response.is_streamed:
+            # Streamed bodies (static files) are only measured as they are sent
+            response.response = self._count_chunks(response.response, kind)
+            self._add(kind, responses=1, compressed=compressed, raw_bytes=raw or 0)
+        else:
+            self._add(kind, responses=1, compressed=compressed, raw_bytes=raw or response.content_length or 0,
+                      sent_bytes=response.content_length or 0)
+        return response
+
+    def _count_chunks(self, chunks, kind):
+        for chunk in chunks:
+            self._add(kind, sent_bytes=len(chunk))
+            yield chunk
+
+    def snapshot(self):
+        with self._lock:
+            return {kind: dict(counters) for kind, counters in self._counters.items()}
+
+    def view(self):
+        return jsonify(self.snapshot())
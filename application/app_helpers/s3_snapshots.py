@@ -0,0 +1,88 @@
+import json
+import socket
+import time
+
+from botocore.exceptions import ClientError
+
+from app_helpers.serialization import get_codec
+from app_helpers.snapshot_poller import Snapshot
+
+
+def error_code(e):
+    return e.response.get("Error", {}).get("Code")
+
+
+class S3Snapshots:
+    # Cross-task distribution: one task holds the lease and publishes, every other task pulls new versions
+
+    def __init__(self, s3_client, bucket, prefix="snapshots/", lease_seconds=120, follow_interval=5, owner=None,
+                 codec="arrow-zstd"):
+        self.s3 = s3_client
+        self.codec = get_codec(codec)
+        self.bucket = bucket
+        self.prefix = prefix
+        self.lease_seconds = lease_seconds
+        self.follow_interval = follow_interval  # seconds between conditional GETs of the pointer
+        # Fargate tasks get their own hostname, so every worker of a task shares the lease
+        self.owner = owner or socket.gethostname()
+        self.lease_key = f"{prefix}lease.json"
+        self.pointer_key = f"{prefix}LATEST"
+        self._pointer_etag = None
+
+    def try_lead(self):
+        # Acquire or renew the lease with conditional writes, so two tasks can never both win
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self.lease_key)
+            lease = json.loads(response["Body"].read())
+            condition = {"IfMatch": response["ETag"]}
+        except ClientError as e:
+            if error_code(e) not in ("NoSuchKey", "404"):
+                print(f"Error reading snapshot lease: {e}")
+                return False
+            lease, condition = None, {"IfNoneMatch": "*"}
+
+        if lease is not None and lease["owner"] != self.owner and lease["expires_at"] > time.time():
+            return False
+
+        body = json.dumps({"owner": self.owner, "expires_at": time.time() + self.lease_seconds})
+        try:
+            self.s3.put_object(Bucket=self.bucket, Key=self.lease_key, Body=body.encode(), **condition)
+        except ClientError as e:
+            if error_code(e) not in ("PreconditionFailed", "ConditionalRequestConflict", "412"):
+                print(f"Error writing snapshot lease: {e}")
+            return False
+        return True
+
+    def snapshot_key(self, version):
+        return f"{self.prefix}snapshot-{version}.arrow"
+
+    def publish(self, snapshot):
+        body = self.codec.dumps(snapshot.data, {"fetched_at": snapshot.fetched_at})
+        # Data first, pointer last: followers never see a version whose object is missing
+        try:
+            self.s3.put_object(Bucket=self.bucket, Key=self.snapshot_key(snapshot.version), Body=body)
+            self.s3.put_object(Bucket=self.bucket, Key=self.pointer_key, Body=snapshot.version.encode())
+        except ClientError as e:
+            print(f"Error publishing snapshot {snapshot.version}: {e}")
+
+    def fetch_newer(self, current_version=None):
+        # Conditional GET on the pointer; a 304 costs a request and no transfer
+        condition = {"IfNoneMatch": self._pointer_etag} if self._pointer_etag else {}
+        try:
+            response = self.s3.get_object(Bucket=self.bucket, Key=self.pointer_key, **condition)
+        except ClientError as e:
+            if error_code(e) not in ("304", "NotModified", "NoSuchKey", "404"):
+                print(f"Error reading snapshot pointer: {e}")
+            return None
+        version = response["Body"].read().decode()
+        self._pointer_etag = response["ETag"]
+        if not version or version == current_version:
+            return None
+        try:
+            body = self.s3.get_object(Bucket=self.bucket, Key=self.snapshot_key(version))["Body"].read()
+        except ClientError as e:
+            print(f"Error downloading snapshot {version}: {e}")
+            self._pointer_etag = None
+            return None
+        df, metadata = self.codec.loads(body)
+        return Snapshot(version, df, float(metadata.get("fetched_at", time.time())))
@@ -0,0 +1,88 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+
+from app_helpers import time_axis
+
+# Frame codecs for every boundary a snapshot crosses (store, cache, worker IPC, S3).
+# dumps(df, metadata) -> bytes and loads(data) -> (df, metadata), with metadata a flat dict of strings.
+
+
+class ArrowCodec:
+    # Arrow IPC file format (Feather v2): pandas metadata keeps index dtype, names and categoricals exact
+
+    def __init__(self, compression=None, cadence=True):
+        self.compression = compression  # None keeps buffers mappable zero-copy; "zstd" or "lz4" for network hops
+        self.cadence = cadence  # store a regular time index as start/step/breaks instead of a column
+
+    def to_table(self, df, metadata=None):
+        axis = time_axis.encode_index(df.index) if self.cadence else None
+        table = pa.Table.from_pandas(df, preserve_index=axis is None)
+        # from_pandas turns NaN into nulls, which forces a copy on the way back; keep float buffers as they are
+        for i, field in enumerate(table.schema):
+            if pa.types.is_floating(field.type) and field.name in df.columns:
+                table = table.set_column(i, field, pa.array(df[field.name].to_numpy()))
+        if axis is not None:
+            # Without an index pandas metadata drops the columns' name, so it travels with the axis
+            metadata = dict(metadata or {}, time_axis=json.dumps(dict(axis, columns_name=df.columns.name)))
+        if metadata:
+            schema_metadata = dict(table.schema.metadata or {})
+            schema_metadata.update({key.encode(): str(value).encode() for key, value in metadata.items()})
+            table = table.replace_schema_metadata(schema_metadata)
+        return table
+
+    def from_table(self, table):
+        # split_blocks leaves each column a view on the source buffer instead of consolidating copies
+        df = table.to_pandas(split_blocks=True)
+        metadata = {key.decode(): value.decode() for key, value in (table.schema.metadata or {}).items()
+                    if key != b"pandas"}
+        if "time_axis" in metadata:
+            axis = json.loads(metadata.pop("time_axis"))
+            df.index = time_axis.decode_index(axis)
+            df.columns.name = axis["columns_name"]
+        return df, metadata
+
+    def write(self, df, sink, metadata=None):
+        table = self.to_table(df, metadata)
+        options = pa.ipc.IpcWriteOptions(compression=self.compression)
+        with pa.ipc.new_file(sink, table.schema, options=options) as writer:
+            writer.write_table(table)
+
+    def dumps(self, df, metadata=None):
+        sink = pa.BufferOutputStream()
+        self.write(df, sink, metadata)
+        return sink.getvalue().to_pybytes()
+
+    def loads(self, data):
+        # data may be bytes, a pyarrow Buffer or a memory map; the latter two are read without copying
+        return self.from_table(pa.ipc.open_file(data).read_all())
+
+
+class JsonCodec:
+    # The original to_json(orient='split') path, kept for compatibility and comparison
+
+    def dumps(self, df, metadata=None):
+        return json.dumps({"metadata": metadata or {}, "frame": df.to_json(orient="split", date_unit="ns")}).encode()
+
+    def loads(self, data):
+        payload = json.loads(bytes(data))
+        df = pd.read_json(io.StringIO(payload["frame"]), orient="split")
+        return df, payload["metadata"]
+
+
+CODECS = {}
+
+
+def register_codec(name, codec):
+    CODECS[name] = codec
+
+
+def get_codec(name="arrow"):
+    return CODECS[name]
+
+
+register_codec("arrow", ArrowCodec())
+register_codec("arrow-zstd", ArrowCodec(compression="zstd"))
+register_codec("json", JsonCodec())
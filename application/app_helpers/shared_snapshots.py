@@ -0,0 +1,126 @@
+import fcntl
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+
+import pyarrow as pa
+
+from app_helpers.serialization import get_codec
+from app_helpers.snapshot_poller import Snapshot
+
+DEFAULT_DIRECTORY = os.environ.get(
+    "SNAPSHOT_DIR",
+    "/dev/shm/trading-app" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "trading-app")
+)
+
+
+class SharedSnapshots:
+    # Snapshots written once per version as Arrow IPC files, mapped read-only by every worker
+
+    def __init__(self, directory=DEFAULT_DIRECTORY, keep=3, codec="arrow"):
+        self.directory = directory
+        self.codec = get_codec(codec)  # must stay uncompressed for zero-copy mapping
+        self.keep = keep
+        self.pointer_path = os.path.join(directory, "current")
+        self.activity_path = os.path.join(directory, "activity")
+        os.makedirs(directory, exist_ok=True)
+        self._lock_file = None
+        self._lock_pid = None
+        self._current = None
+        self._recent = OrderedDict()  # version -> mapped Snapshot, bounded by keep
+        self._recent_lock = threading.Lock()
+        self._last_touch = 0
+
+    def snapshot_path(self, version):
+        return os.path.join(self.directory, f"snapshot-{version}.arrow")
+
+    def try_lead(self):
+        # Only the worker holding the lock queries Timestream; the kernel drops it if that worker dies
+        if self._lock_pid == os.getpid():
+            return True
+        lock_file = open(os.path.join(self.directory, "refresher.lock"), "a")
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return False
+        self._lock_file, self._lock_pid = lock_file, os.getpid()
+        return True
+
+    def _replace(self, path, write):
+        # Write to a temporary name and rename, so readers only ever see complete files
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "wb") as f:
+            write(f)
+        os.replace(tmp_path, path)
+
+    def publish(self, snapshot):
+        self._replace(self.snapshot_path(snapshot.version),
+                      lambda f: self.codec.write(snapshot.data, f, {"fetched_at": snapshot.fetched_at}))
+        self._replace(self.pointer_path, lambda f: f.write(snapshot.version.encode()))
+        self._prune(snapshot.version)
+
+    def _prune(self, current_version):
+        # Unlinked files stay valid for workers that still have them mapped
+        paths = [os.path.join(self.directory, name) for name in os.listdir(self.directory)
+                 if name.startswith("snapshot-") and name.endswith(".arrow")]
+        paths.sort(key=os.path.getmtime, reverse=True)
+        for path in paths[self.keep:]:
+            if path != self.snapshot_path(current_version):
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+    def current_version(self):
+        try:
+            with open(self.pointer_path, "rb") as f:
+                return f.read().decode() or None
+        except FileNotFoundError:
+            return None
+
+    def latest(self):
+        # Cheap pointer read per call; the snapshot is only mapped again when the version moves
+        version = self.current_version()
+        if version is None:
+            return self._current
+        if self._current is not None and self._current.version == version:
+            return self._current
+        snapshot = self.get(version)
+        if snapshot is not None:
+            self._current = snapshot
+        return self._current
+
+    def get(self, version):
+        # Resolve a version id to its mapped snapshot; evicted or pruned versions return None
+        with self._recent_lock:
+            if version in self._recent:
+                self._recent.move_to_end(version)
+                return self._recent[version]
+        try:
+            df, metadata = self.codec.loads(pa.memory_map(self.snapshot_path(version), "r"))
+        except FileNotFoundError:
+            return None
+        snapshot = Snapshot(version, df, float(metadata.get("fetched_at", time.time())))
+        with self._recent_lock:
+            self._recent[version] = snapshot
+            while len(self._recent) > self.keep:
+                self._recent.popitem(last=False)
+        return snapshot
+
+    def touch(self, every=5):
+        # Shared activity marker so the refresher keeps polling while any worker has sessions
+        now = time.time()
+        if now - self._last_touch < every:
+            return
+        self._last_touch = now
+        with open(self.activity_path, "a"):
+            os.utime(self.activity_path)
+
+    def last_activity(self):
+        try:
+            return os.path.getmtime(self.activity_path)
+        except FileNotFoundError:
+            return 0
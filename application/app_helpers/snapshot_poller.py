@@ -0,0 +1,184 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+import pandas as pd
+
+# Published snapshots are never mutated; a refresh swaps in a new one
+Snapshot = namedtuple("Snapshot", ["version", "data", "fetched_at"])
+
+
+def snapshot_version(df):
+    # Same data -> same version, so unchanged refreshes publish nothing new
+    digest = hashlib.blake2b(pd.util.hash_pandas_object(df, index=True).values.tobytes(), digest_size=4)
+    last_ms = int(pd.Timestamp(df.index[-1]).value // 1_000_000) if len(df.index) else 0
+    return f"{last_ms}-{digest.hexdigest()}"
+
+
+class SnapshotPoller:
+    # One background thread per process refreshes the data for every session
+
+    def __init__(self, fetch, interval=60, offset=10, idle_timeout=600, shared=None, remote=None, keep=3,
+                 follow_interval=2):
+        self.fetch = fetch
+        self.shared = shared  # optional SharedSnapshots, so one worker refreshes for all of them
+        self.remote = remote  # optional S3Snapshots, so one task refreshes for all of them
+        self._following_remote = False
+        self._following_shared = False
+        self.follow_interval = follow_interval  # seconds between pointer checks in workers that do not refresh
+        self.interval = interval
+        self.offset = offset  # seconds after each interval boundary, once the bot has written
+        self.idle_timeout = idle_timeout
+        self._snapshot = None
+        self._recent = OrderedDict()  # version -> Snapshot when there is no shared store
+        self.keep = keep
+        self._ready = threading.Event()
+        self._wake = threading.Event()
+        self._start_lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._last_activity = time.time()
+        self._changed = threading.Condition()  # notified whenever the current version moves
+
+    def latest(self, timeout=30):
+        # Called by session callbacks; counts as activity and waits for the first snapshot
+        self.touch()
+        self.ensure_started()
+        if self.shared is not None:
+            deadline = time.monotonic() + timeout
+            while (snapshot := self.shared.latest()) is None and time.monotonic() < deadline:
+                time.sleep(0.2)
+            return snapshot
+        if self._snapshot is None:
+            self._ready.wait(timeout)
+        return self._snapshot
+
+    def current_version(self):
+        # The published version without waiting, touching activity or starting a poller thread.
+        # Background callback jobs run in their own process and rely on the shared store for this.
+        if self.shared is not None:
+            return self.shared.current_version()
+        return self._snapshot.version if self._snapshot is not None else None
+
+    def get(self, version):
+        # Resolve a session's version id to its snapshot, or the latest one once it was evicted.
+        # Never waits: a version from before a cold start (a replaced task) gets None until one is published.
+        self.touch()
+        if self.shared is not None:
+            snapshot = self.shared.get(version)
+        else:
+            snapshot = self._recent.get(version)
+        return snapshot if snapshot is not None else self.latest(timeout=0)
+
+    def wait_for_change(self, version, timeout):
+        # Block until a snapshot other than version is current, or return None after timeout.
+        # Event streams park here, so a new version reaches every open stream without them polling.
+        self.touch()
+        self.ensure_started()
+        with self._changed:
+            self._changed.wait_for(lambda: self._snapshot is not None and self._snapshot.version != version, timeout)
+            snapshot = self._snapshot
+        return snapshot if snapshot is not None and snapshot.version != version else None
+
+    def _set_current(self, snapshot):
+        with self._changed:
+            changed = snapshot is not None and (self._snapshot is None or self._snapshot.version != snapshot.version)
+            self._snapshot = snapshot
+            if changed:
+                self._changed.notify_all()
+
+    def touch(self):
+        self._last_activity = time.time()
+        if self.shared is not None:
+            self.shared.touch()
+        self._wake.set()
+
+    def is_idle(self):
+        last_activity = self._last_activity
+        if self.shared is not None:
+            last_activity = max(last_activity, self.shared.last_activity())
+        return time.time() - last_activity > self.idle_timeout
+
+    def ensure_started(self):
+        # Threads do not survive fork, so a forked worker starts its own poller
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="snapshot-poller", daemon=True)
+            self._thread.start()
+
+    def refresh(self):
+        self._following_shared = self.shared is not None and not self.shared.try_lead()
+        if self._following_shared:
+            # Another worker is the refresher; just follow its published snapshots
+            self._set_current(self.shared.latest())
+            return self._snapshot
+        self._following_remote = self.remote is not None and not self.remote.try_lead()
+        if self._following_remote:
+            # Another task holds the lease; pull its versions instead of querying Timestream
+            current_version = self._snapshot.version if self._snapshot is not None else None
+            snapshot = self.remote.fetch_newer(current_version)
+            if snapshot is not None:
+                self._publish(snapshot)
+            return self._snapshot
+        try:
+            df = self.fetch()
+        except Exception as e:
+            print(f"Error refreshing snapshot: {e}")
+            return self._snapshot
+        if df is None or df.empty:
+            return self._snapshot
+        version = snapshot_version(df)
+        if self._snapshot is None or self._snapshot.version != version:
+            snapshot = Snapshot(version, df, time.time())
+            # Local sessions first, so an S3 outage only delays the other tasks
+            self._publish(snapshot)
+            if self.remote is not None:
+                self.remote.publish(snapshot)
+        return self._snapshot
+
+    def _publish(self, snapshot):
+        if self.shared is not None:
+            # Serve the mapped copy too, so the fetched frame can be freed
+            self.shared.publish(snapshot)
+            snapshot = self.shared.latest()
+        else:
+            self._recent[snapshot.version] = snapshot
+            while len(self._recent) > self.keep:
+                self._recent.popitem(last=False)
+        self._set_current(snapshot)
+        print(f"Published snapshot {snapshot.version}")
+        self._ready.set()
+
+    def seconds_until_next_tick(self):
+        now = time.time()
+        next_tick = (now - self.offset) // self.interval * self.interval + self.interval + self.offset
+        return next_tick - now
+
+    def _run(self):
+        while True:
+            if self.is_idle():
+                self._wake.clear()
+                if self.is_idle():
+                    print("No active sessions, pausing snapshot poller")
+                    # Wake on local activity, or re-check activity from other workers every interval
+                    while not self._wake.wait(self.interval) and self.is_idle():
+                        pass
+                    print("Session activity, resuming snapshot poller")
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing snapshot: {e}")
+            if self._following_remote:
+                # Followers check the pointer often so every task switches versions within seconds
+                time.sleep(min(self.remote.follow_interval, self.seconds_until_next_tick()))
+            elif self._following_shared:
+                # The refresher publishes a few seconds after the tick, once its query returns
+                time.sleep(min(self.follow_interval, self.seconds_until_next_tick()))
+            else:
+                time.sleep(self.seconds_until_next_tick())
@@ -0,0 +1,55 @@
+import numpy as np
+import pandas as pd
+
+# Regular-cadence codec for time axes. The bot writes once a minute, so an index is almost always
+# start + i * step, broken only where a write was missed or landed off the grid:
+#   {'start': int, 'step': int, 'length': n, 'breaks': [[position, value], ...]}
+# Each break starts a new run of the same step at that position with that value.
+
+MAX_BREAK_FRACTION = 0.05  # beyond this many breaks per row, explicit values are smaller
+
+
+def encode(values, max_break_fraction=MAX_BREAK_FRACTION):
+    # Cadence encoding of sorted int64 values, or None when they are too irregular to be worth it
+    values = np.asarray(values, dtype=np.int64)
+    n = len(values)
+    if n < 2:
+        return None
+    diffs = np.diff(values)
+    steps, counts = np.unique(diffs, return_counts=True)
+    step = int(steps[np.argmax(counts)])
+    if step <= 0:
+        return None
+    positions = np.flatnonzero(diffs != step) + 1
+    if len(positions) > max_break_fraction * n:
+        return None
+    return {'start': int(values[0]), 'step': step, 'length': n,
+            'breaks': [[int(p), int(values[p])] for p in positions]}
+
+
+def decode(axis):
+    n = axis['length']
+    run_starts = np.array([0] + [p for p, _ in axis['breaks']], dtype=np.int64)
+    run_values = np.array([axis['start']] + [v for _, v in axis['breaks']], dtype=np.int64)
+    run_lengths = np.diff(np.append(run_starts, n))
+    position_in_run = np.arange(n, dtype=np.int64) - np.repeat(run_starts, run_lengths)
+    return np.repeat(run_values, run_lengths) + position_in_run * axis['step']
+
+
+def is_regular(axis):
+    # No breaks at all: plotly can take the axis as x0/dx
+    return axis is not None and not axis['breaks']
+
+
+def encode_index(index):
+    # DatetimeIndex in its own unit, with the name needed to rebuild it exactly
+    if not isinstance(index, pd.DatetimeIndex) or index.tz is not None or index.hasnans:
+        return None
+    axis = encode(index.asi8)
+    if axis is not None:
+        axis.update(unit=index.unit, name=index.name)
+    return axis
+
+
+def decode_index(axis):
+    return pd.DatetimeIndex(decode(axis).view(f"datetime64[{axis['unit']}]"), name=axis['name'])
@@ -0,0 +1,353 @@
+// Clientside callbacks for the Strategy View
+
+// {dtype, bdata} typed-array spec from figure_builder.typed_array as a plain array
+function decodeTypedArray(spec) {
+    if (!spec || !spec.bdata) {
+        return spec;
+    }
+    var binary = atob(spec.bdata);
+    var bytes = new Uint8Array(binary.length);
+    for (var i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return Array.from(new Float64Array(bytes.buffer));
+}
+
+// {start, step, length, breaks} cadence encoding from app_helpers.time_axis as a plain array;
+// each break [position, value] starts a new run of the same step
+function decodeTimeAxis(axis) {
+    if (!axis || axis.step === undefined) {
+        return decodeTypedArray(axis);
+    }
+    var values = new Array(axis.length);
+    var breaks = axis.breaks.concat([[axis.length, null]]);
+    var position = 0, value = axis.start;
+    breaks.forEach(function(br) {
+        for (; position < br[0]; position++, value += axis.step) {
+            values[position] = value;
+        }
+        value = br[1];
+    });
+    return values;
+}
+
+// Trace payload (full) or delta (rows after delta.previous) from the server applied to traces, decoded to
+// plain arrays; null when the delta does not continue traces
+function applyTraceDelta(traces, delta) {
+    if (!delta || (!delta.full && (!traces || delta.previous !== traces.version))) {
+        return null;
+    }
+    var y = {};
+    Object.keys(delta.y).forEach(function(col) {
+        y[col] = decodeTypedArray(delta.y[col]);
+    });
+    delta = Object.assign({}, delta, {x: decodeTimeAxis(delta.x), y: y});
+    if (delta.full) {
+        return delta;
+    }
+    if (Object.keys(delta.y).join('\n') !== Object.keys(traces.y).join('\n')) {
+        return null;
+    }
+    var keep = delta.max_points;
+    var merged = Object.assign({}, traces, {version: delta.version, max_points: keep});
+    merged.x = traces.x.concat(delta.x).slice(-keep);
+    merged.y = {};
+    Object.keys(delta.y).forEach(function(col) {
+        merged.y[col] = traces.y[col].concat(delta.y[col]).slice(-keep);
+    });
+    return merged;
+}
+
+// Rows after the last cached time from /api/traces, or every trace when there is no cached copy
+function fetchTraces(cached) {
+    var url = '/api/traces';
+    if (cached && cached.x.length) {
+        url += '?version=' + encodeURIComponent(cached.version) + '&since=' + cached.x[cached.x.length - 1];
+    }
+    return fetch(url, {cache: 'no-store', credentials: 'same-origin'}).then(function(response) {
+        if (response.status !== 200) {
+            throw new Error('GET /api/traces: ' + response.status);
+        }
+        return response.json();
+    });
+}
+
+// Persistent copy of the trace store in IndexedDB, one record per table and window (the cache key) with
+// every measure as a Float64Array column. Structured clone stores the buffers as they are, and without
+// IndexedDB (private windows, old browsers) every read is a miss and writes are dropped.
+var traceCacheDb = null;
+
+function openTraceCache() {
+    if (!traceCacheDb) {
+        traceCacheDb = new Promise(function(resolve) {
+            if (typeof indexedDB === 'undefined') {
+                resolve(null);
+                return;
+            }
+            var request = indexedDB.open('trading-app', 1);
+            request.onupgradeneeded = function() {
+                request.result.createObjectStore('traces');
+            };
+            request.onsuccess = function() { resolve(request.result); };
+            request.onerror = request.onblocked = function() { resolve(null); };
+        });
+    }
+    return traceCacheDb;
+}
+
+function readTraceCache(key) {
+    return openTraceCache().then(function(db) {
+        if (!db || !key) {
+            return null;
+        }
+        return new Promise(function(resolve) {
+            var request = db.transaction('traces', 'readonly').objectStore('traces').get(key);
+            request.onsuccess = function() {
+                var record = request.result;
+                if (!record) {
+                    resolve(null);
+                    return;
+                }
+                var y = {};
+                record.columns.forEach(function(col, i) {
+                    y[col] = Array.from(record.y[i]);
+                });
+                resolve(Object.assign({}, record.meta, {x: Array.from(record.x), y: y}));
+            };
+            request.onerror = function() { resolve(null); };
+        });
+    });
+}
+
+function writeTraceCache(key, traces) {
+    return openTraceCache().then(function(db) {
+        if (!db || !key || !traces) {
+            return;
+        }
+        var columns = Object.keys(traces.y);
+        var record = {
+            meta: {version: traces.version, full: true, max_points: traces.max_points, layout: traces.layout,
+                   webgl_threshold: traces.webgl_threshold},
+            x: Float64Array.from(traces.x),
+            columns: columns,
+            y: columns.map(function(col) { return Float64Array.from(traces.y[col]); })
+        };
+        db.transaction('traces', 'readwrite').objectStore('traces').put(record, key);
+    }).catch(function() {});
+}
+
+if (typeof document !== 'undefined' && document.addEventListener) {
+    document.addEventListener('visibilitychange', function() {
+        if (window.dash_clientside.set_props) {
+            window.dash_clientside.set_props('page-visible', {data: !document.hidden});
+        }
+    });
+}
+
+window.dash_clientside = Object.assign({}, window.dash_clientside, {
+    dashboard: {
+        // Latest snapshot version from /api/snapshot. The version is the ETag, so an unchanged snapshot
+        // comes back as an empty 304 and the stores (and every callback hanging off them) stay put.
+        // The snapshot-retry interval calls it too, every few seconds while nothing is published yet.
+        refreshSnapshot: function(n, retries, current) {
+            var dashboard = window.dash_clientside.dashboard;
+            var noUpdate = window.dash_clientside.no_update;
+            // Hidden or off the Strategy View (including a page opened in a background tab): no stream, no poll
+            if (dashboard.paused || document.hidden) {
+                return noUpdate;
+            }
+            // The catch-up after a pause is this one request; the event stream reopens on the next tick
+            if (dashboard.catchingUp) {
+                dashboard.catchingUp = false;
+            } else if (dashboard.connectEvents(current)) {
+                return noUpdate;
+            }
+            var headers = current ? {'If-None-Match': '"' + current + '"'} : {};
+            return fetch('/api/snapshot', {headers: headers, cache: 'no-store', credentials: 'same-origin'})
+                .then(function(response) {
+                    if (response.status === 503 && !current) {
+                        // Nothing published yet: ask again every few seconds until snapshotStatus stops it
+                        window.dash_clientside.set_props('snapshot-retry', {disabled: false});
+                    }
+                    if (response.status !== 200) {
+                        return noUpdate;
+                    }
+                    return response.json().then(function(snapshot) {
+                        return snapshot.version === current ? noUpdate : snapshot.version;
+                    });
+                })
+                .catch(function() { return noUpdate; });
+        },
+
+        // Hides the cold-start message and stops the fast retry once the first version is in
+        snapshotStatus: function(version) {
+            if (!version) {
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            return [{display: 'none'}, true];
+        },
+
+        // Refresh only runs for someone looking at the Strategy View. A hidden page or the Information Feed
+        // View stops the interval and closes the event stream; coming back fires one refresh, which picks
+        // up everything published meanwhile as a single delta.
+        paused: false,
+        catchingUp: false,
+        pauseRefresh: function(visible, tab, n) {
+            var dashboard = window.dash_clientside.dashboard;
+            var noUpdate = window.dash_clientside.no_update;
+            // document.hidden as well, for a page that was opened in a background tab
+            var active = visible !== false && !document.hidden && tab === 'graph-tab';
+            if (!active) {
+                if (dashboard.events) {
+                    dashboard.events.close();
+                    dashboard.events = null;
+                }
+                dashboard.paused = true;
+                return [true, noUpdate];
+            }
+            if (dashboard.paused || document.hidden) {
+                dashboard.paused = false;
+                dashboard.catchingUp = true;
+                return [false, (n || 0) + 1];
+            }
+            return [false, noUpdate];
+        },
+
+        // Zoom/pan events together with the plot's pixel width, for viewport-aware resampling
+        captureView: function(relayoutData) {
+            var graph = document.getElementById('multi-axis-graph');
+            return {relayout: relayoutData || null, width: graph ? graph.offsetWidth : null};
+        },
+
+        // Server-sent points for dcc.Graph extendData. plotly.js keeps typed-array traces as their
+        // {dtype, bdata} spec, which extendTraces cannot grow, so swap in the array it already decoded
+        // and send the new points as the same array type.
+        extendFigure: function(extend) {
+            var gd = document.querySelector('#multi-axis-graph .js-plotly-plot');
+            if (!extend || !gd || !gd.data) {
+                return window.dash_clientside.no_update;
+            }
+            var update = {};
+            Object.keys(extend[0]).forEach(function(key) {
+                update[key] = extend[1].map(function(index, j) {
+                    var trace = gd.data[index];
+                    // A regular trace sent as x0/dx needs explicit x before points can roll off its front
+                    if (trace[key] === undefined && trace[key + '0'] !== undefined) {
+                        var other = trace[key === 'x' ? 'y' : 'x'];
+                        var length = other.bdata ? (other._inputArray || decodeTypedArray(other)).length : other.length;
+                        trace[key] = new Float64Array(length);
+                        for (var i = 0; i < length; i++) {
+                            trace[key][i] = trace[key + '0'] + i * trace['d' + key];
+                        }
+                        delete trace[key + '0'];
+                        delete trace['d' + key];
+                    }
+                    if (trace[key] && trace[key].bdata) {
+                        trace[key] = trace[key]._inputArray || new Float64Array(decodeTypedArray(trace[key]));
+                    }
+                    var points = extend[0][key][j].map(function(v) { return v === null ? NaN : v; });
+                    return ArrayBuffer.isView(trace[key]) ? new trace[key].constructor(points) : points;
+                });
+            });
+            return [update].concat(extend.slice(1));
+        },
+
+        // Push channel from /api/events: each new version lands in data-store, or with its appended rows in
+        // trace-delta, within seconds of the refresh. Returns true while connected, so polling can pause.
+        events: null,
+        connectEvents: function(current) {
+            var dashboard = window.dash_clientside.dashboard;
+            if (typeof EventSource === 'undefined') {
+                return false;
+            }
+            if (dashboard.events && dashboard.events.readyState === EventSource.CLOSED) {
+                // Refused (stream limit) or failed for good: poll for now and try again next time
+                dashboard.events = null;
+                return false;
+            }
+            if (!dashboard.events) {
+                var url = '/api/events' + (current ? '?version=' + encodeURIComponent(current) : '');
+                dashboard.events = new EventSource(url, {withCredentials: true});
+                dashboard.events.addEventListener('snapshot', function(message) {
+                    var event = JSON.parse(message.data);
+                    // One store per push: mergeTraces passes the version on to data-store itself, so
+                    // syncTraces only goes to /api/traces when the delta did not fit
+                    if (event.traces) {
+                        window.dash_clientside.set_props('trace-delta', {data: event.traces});
+                    } else {
+                        window.dash_clientside.set_props('data-store', {data: event.version});
+                    }
+                });
+            }
+            return dashboard.events.readyState === EventSource.OPEN;
+        },
+
+        // CLIENTSIDE_TRACES=1 only from here on
+        // Same column limit as v24: once four columns are shown, no more can be added
+        maxColumns: 4,
+
+        mergeTraces: function(delta, traces, cacheKey) {
+            // The same rows can arrive from /api/events and /api/traces; only apply them on top of their base
+            var noUpdate = window.dash_clientside.no_update;
+            if (!delta) {
+                return [noUpdate, noUpdate, noUpdate];
+            }
+            var merged = applyTraceDelta(traces, delta);
+            if (!merged) {
+                // Hand the version to syncTraces, which fetches what the store is missing
+                return [noUpdate, noUpdate, delta.version];
+            }
+            writeTraceCache(cacheKey, merged);
+            return [merged, merged.version, merged.version];
+        },
+
+        // Brings the trace store up to version. On page load it starts from the IndexedDB copy, so only
+        // the rows published since then come from /api/traces (nothing at all if the copy is current).
+        syncTraces: function(version, loadedVersion, traces, cacheKey) {
+            var noUpdate = window.dash_clientside.no_update;
+            if (!version || version === loadedVersion) {
+                return [noUpdate, noUpdate];
+            }
+            var base = traces ? Promise.resolve(traces) : readTraceCache(cacheKey);
+            return base.then(function(cached) {
+                if (cached && cached.version === version) {
+                    return [cached, cached.version];
+                }
+                return fetchTraces(cached).then(function(delta) {
+                    var merged = applyTraceDelta(cached, delta);
+                    // A copy the delta does not fit (other columns) is replaced by every trace
+                    return merged || fetchTraces(null).then(function(full) { return applyTraceDelta(null, full); });
+                }).then(function(merged) {
+                    writeTraceCache(cacheKey, merged);
+                    return [merged, merged.version];
+                });
+            }).catch(function() { return [noUpdate, noUpdate]; });
+        },
+
+        renderFigure: function(selected, traces) {
+            if (!traces) {
+                // Keep the figure and options the page came with until the traces are in
+                return [window.dash_clientside.no_update, window.dash_clientside.no_update];
+            }
+            var limit = window.dash_clientside.dashboard.maxColumns;
+            var columns = (selected || []).filter(function(col) { return col in traces.y; });
+            var full = columns.length >= limit;
+            var options = Object.keys(traces.y).map(function(col) {
+                return {label: col.toLowerCase(), value: col, disabled: full};
+            });
+
+            var layout = Object.assign({}, traces.layout);
+            // Same switch as the server: WebGL once the figure holds more points than the threshold
+            var threshold = traces.webgl_threshold;
+            var type = threshold !== null && traces.x.length * columns.length > threshold ? 'scattergl' : 'scatter';
+            var data = columns.map(function(col, i) {
+                var axis = i === 0 ? '' : String(i + 1);
+                // The first axis anchors the plot; the others overlay it and autoshift out of the way
+                layout['yaxis' + axis] = i === 0 ? {title: {text: col}}
+                    : {title: {text: col}, anchor: 'free', overlaying: 'y', autoshift: true};
+                return {type: type, x: traces.x, y: traces.y[col], mode: 'lines', name: col, yaxis: 'y' + axis};
+            });
+            return [{data: data, layout: layout}, options];
+        }
+    }
+});
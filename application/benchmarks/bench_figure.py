@@ -0,0 +1,73 @@
+# Compare the dict figure builder with the go.Figure path it replaced: build + encode time, identical output.
+# Run from application/:  python benchmarks/bench_figure.py
+import argparse
+import json
+import os
+import sys
+
+import plotly.graph_objects as go
+import plotly.io as pio
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_helpers.downsample import downsample  # noqa: E402
+from app_helpers.figure_builder import build_figure, typed_array, x_coordinates  # noqa: E402
+from bench_serialization import best_of, seven_day_frame  # noqa: E402
+
+
+def build_figure_go(df, selected_columns, theme="plotly", max_points=None, x_range=None, method="minmax",
+                    webgl=False):
+    # The previous implementation, validating every property through plotly's graph objects
+    fig = go.Figure()
+    if selected_columns:
+        y_axes = {}
+        for i, col in enumerate(selected_columns):
+            x, y = df.index, df[col].to_numpy()
+            if max_points and len(y) > max_points:
+                keep = downsample(x.asi8, y, max_points, method)
+                x, y = x[keep], y[keep]
+            trace_type = go.Scattergl if webgl else go.Scatter
+            fig.add_trace(trace_type(**x_coordinates(x), y=typed_array(y), mode='lines', name=col, yaxis=f'y{i + 1}'))
+            y_axes['yaxis' if i == 0 else f'yaxis{i + 1}'] = (
+                {'title': col} if i == 0 else {'title': col, 'anchor': 'free', 'overlaying': 'y', 'autoshift': True})
+        xaxis = {'title': "Datetime", 'type': 'date'}
+        if x_range:
+            xaxis['range'] = x_range
+        fig.update_layout(template=theme, xaxis=xaxis, **y_axes)
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        margin=dict(l=40, r=40, t=60, b=60, pad=0),
+        showlegend=True
+    )
+    return fig
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the dict figure builder against go.Figure")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-points", type=int, default=2000)
+    args = parser.parse_args()
+
+    df = seven_day_frame(4)
+    columns = list(df.columns[:4])
+    cases = [
+        ("1 column, downsampled", columns[:1], args.max_points, None),
+        ("4 columns, downsampled", columns, args.max_points, None),
+        ("4 columns, zoomed 8h", columns, args.max_points, ["2025-01-07 12:00", "2025-01-07 20:00"]),
+        ("4 columns, all points", columns, None, None),
+    ]
+    for name, selected, max_points, x_range in cases:
+        view = df if not x_range else df.loc[x_range[0]:x_range[1]]
+        go_s, go_json = best_of(
+            lambda: pio.to_json(build_figure_go(view, selected, "plotly", max_points, x_range)), args.repeat)
+        dict_s, dict_json = best_of(
+            lambda: pio.to_json(build_figure(view, selected, "plotly", max_points, x_range), validate=False),
+            args.repeat)
+        identical = json.loads(go_json) == json.loads(dict_json)
+        print(f"{name:>24}: go.Figure {go_s * 1000:7.2f} ms  dict {dict_s * 1000:7.2f} ms  "
+              f"x{go_s / dict_s:5.1f}  identical: {identical}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Compare response encoders on the payloads update_graph and /api/traces actually send.
+# Run from application/:  python benchmarks/bench_json.py
+import argparse
+import os
+import sys
+
+import plotly.io.json
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_helpers import fast_json  # noqa: E402
+from app_helpers.figure_builder import (build_figure, default_axes, extend_data, patch_columns,  # noqa: E402
+                                        trace_payload)
+from bench_serialization import best_of, seven_day_frame  # noqa: E402
+
+
+def responses(df, max_points):
+    # Callback response bodies shaped the way Dash wraps them
+    columns = list(df.columns[:4])
+    figure_state = {'version': 'v', 'columns': columns, 'range': None, 'width': max_points // 2}
+    patch, _ = patch_columns(df, columns[:3], columns, default_axes(columns[:3]), max_points)
+    return {
+        "full figure, 1 column": build_figure(df, columns[:1], max_points=max_points),
+        "full figure, 4 columns": build_figure(df, columns, max_points=max_points),
+        "column patch": patch,
+        "extendData, 2 rows": extend_data(df.iloc[-2:], columns),
+        "clientside traces": trace_payload(df, 'v'),
+    }, figure_state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON encoders for Dash responses")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-points", type=int, default=2000)
+    args = parser.parse_args()
+
+    plotly_encoder = plotly.io.json.to_json_plotly
+    bodies, figure_state = responses(seven_day_frame(20), args.max_points)
+    encoders = {
+        "plotly json": lambda body: plotly_encoder(body, engine="json"),
+        "plotly orjson": lambda body: plotly_encoder(body, engine="orjson"),
+        "fast_json": fast_json.dumps,
+    }
+    for name, output in bodies.items():
+        body = {"multi": True, "response": {"output": {"data": output}, "figure-state": {"data": figure_state}}}
+        results = []
+        for encoder_name, encode in encoders.items():
+            seconds, encoded = best_of(lambda: encode(body), args.repeat)
+            results.append(f"{encoder_name} {seconds * 1000:6.2f} ms {len(encoded) / 1e3:7.1f} kB")
+        print(f"{name:>23}: " + "  |  ".join(results))
+
+
+if __name__ == "__main__":
+    main()
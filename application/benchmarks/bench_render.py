@@ -0,0 +1,92 @@
+# Browser render benchmark for SVG Scatter vs WebGL Scattergl at growing point counts.
+# Writes a self-contained HTML page; open it in a browser and read the table it fills in.
+# Run from application/:  python benchmarks/bench_render.py --out render_bench.html
+import argparse
+import json
+
+from plotly.offline import get_plotlyjs
+
+PAGE = """<!DOCTYPE html>
+<html>
+<head><meta charset="utf-8"><title>Scatter vs Scattergl</title>
+<script>{plotlyjs}</script></head>
+<body>
+<div id="plot" style="width:1000px;height:500px"></div>
+<table border="1" cellpadding="4"><thead><tr>
+<th>traces</th><th>points / trace</th><th>type</th><th>newPlot ms</th><th>relayout ms</th>
+</tr></thead><tbody id="results"></tbody></table>
+<script>
+var cases = {cases};
+var repeat = {repeat};
+
+function series(n, seed) {{
+    var x = new Array(n), y = new Array(n), v = 100, t = Date.UTC(2025, 0, 1);
+    for (var i = 0; i < n; i++) {{
+        v += Math.sin(i * 0.01 + seed) + (Math.random() - 0.5);
+        x[i] = t + i * 60000;
+        y[i] = v;
+    }}
+    return {{x: x, y: y}};
+}}
+
+async function time(fn) {{
+    var best = Infinity;
+    for (var r = 0; r < repeat; r++) {{
+        var start = performance.now();
+        await fn(r);
+        // Wait for the frame to actually paint, not just for plotly to return
+        await new Promise(function(resolve) {{ requestAnimationFrame(function() {{ setTimeout(resolve); }}); }});
+        best = Math.min(best, performance.now() - start);
+    }}
+    return best;
+}}
+
+async function run() {{
+    var plot = document.getElementById('plot');
+    for (var c of cases) {{
+        var data = [];
+        for (var i = 0; i < c.traces; i++) data.push(series(c.points, i));
+        for (var type of ['scatter', 'scattergl']) {{
+            var traces = data.map(function(s, i) {{
+                return {{type: type, mode: 'lines', x: s.x, y: s.y, yaxis: i ? 'y' + (i + 1) : 'y'}};
+            }});
+            var layout = {{xaxis: {{type: 'date'}}, showlegend: false}};
+            for (var i = 1; i < c.traces; i++) layout['yaxis' + (i + 1)] = {{overlaying: 'y', visible: false}};
+            var newPlot = await time(function() {{ return Plotly.newPlot(plot, traces, layout); }});
+            var first = data[0].x[0], last = data[0].x[c.points - 1];
+            var relayout = await time(function(r) {{
+                // Pan across the last half, like a user dragging the x axis
+                var shift = (last - first) * (r + 1) / (2 * repeat);
+                return Plotly.relayout(plot, {{'xaxis.range': [first + shift, last - shift / 2]}});
+            }});
+            var row = document.createElement('tr');
+            row.innerHTML = '<td>' + c.traces + '</td><td>' + c.points + '</td><td>' + type + '</td><td>'
+                + newPlot.toFixed(1) + '</td><td>' + relayout.toFixed(1) + '</td>';
+            document.getElementById('results').appendChild(row);
+            Plotly.purge(plot);
+        }}
+    }}
+}}
+run();
+</script>
+</body>
+</html>
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a browser benchmark page for Scatter vs Scattergl")
+    parser.add_argument("--out", default="render_bench.html")
+    parser.add_argument("--traces", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--points", type=int, nargs="+", default=[1000, 5000, 10000, 50000])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    cases = [{"traces": t, "points": p} for t in args.traces for p in args.points]
+    with open(args.out, "w") as f:
+        f.write(PAGE.format(plotlyjs=get_plotlyjs(), cases=json.dumps(cases), repeat=args.repeat))
+    print(f"Wrote {args.out} with {len(cases)} cases; open it in a browser and compare the two types per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+# Compare the snapshot codecs with the old to_json(orient='split') path on a realistic 7-day frame.
+# Run from application/:  python benchmarks/bench_serialization.py
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app_helpers.serialization import CODECS  # noqa: E402
+
+
+def seven_day_frame(columns=20, days=7, seed=0):
+    # One row per minute like the bot writes, random-walk measures, a few gaps and a categorical signal
+    rng = np.random.default_rng(seed)
+    index = pd.date_range(end=pd.Timestamp("2025-01-08"), periods=days * 1440, freq="min", name="time")
+    data = {f"measure_{i}": 100 + rng.standard_normal(len(index)).cumsum() for i in range(columns)}
+    df = pd.DataFrame(data, index=index)
+    df.iloc[rng.integers(0, len(index), 200), rng.integers(0, columns, 200)] = np.nan
+    df["signal"] = pd.Categorical(rng.choice(["buy", "hold", "sell"], len(index)))
+    df.columns.name = "measure_name"
+    return df
+
+
+def best_of(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark snapshot serialization codecs")
+    parser.add_argument("--columns", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    df = seven_day_frame(args.columns)
+    print(f"Frame: {len(df)} rows x {len(df.columns)} columns")
+    for name, codec in CODECS.items():
+        encode_s, payload = best_of(lambda: codec.dumps(df), args.repeat)
+        decode_s, (decoded, _) = best_of(lambda: codec.loads(payload), args.repeat)
+        exact = decoded.index.dtype == df.index.dtype and decoded.dtypes.equals(df.dtypes)
+        print(f"{name:>11}: {len(payload) / 1e6:6.2f} MB  encode {encode_s * 1000:7.1f} ms  "
+              f"decode {decode_s * 1000:7.1f} ms  dtypes exact: {exact}")
+
+
+if __name__ == "__main__":
+    main()
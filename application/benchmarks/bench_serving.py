@@ -0,0 +1,119 @@
+# Compare callback throughput of the Werkzeug dev server with the gunicorn production mode.
+# Run from application/:  python benchmarks/bench_serving.py --mode both
+# Needs the same AWS access as the app, since the servers query Timestream.
+import argparse
+import base64
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+AUTH = "Basic " + base64.b64encode(b"TradeAppUser:TradeApp2025").decode()
+
+SERVER_COMMANDS = {
+    "dev": [sys.executable, "web_app_timestream_v25.py"],
+    "gunicorn": [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py", "wsgi:server"],
+}
+
+
+def post_callback(base_url, outputs, inputs, state=()):
+    # Dash names single-output callbacks "id.prop" and multi-output ones "..id.prop...id.prop.."
+    ids = [f"{o['id']}.{o['property']}" for o in outputs]
+    output = ids[0] if len(ids) == 1 else ".." + "...".join(ids) + ".."
+    body = json.dumps({
+        "output": output, "outputs": outputs[0] if len(outputs) == 1 else outputs,
+        "inputs": inputs, "state": list(state),
+        "changedPropIds": [f"{i['id']}.{i['property']}" for i in inputs],
+    }).encode()
+    request = urllib.request.Request(f"{base_url}/_dash-update-component", data=body, method="POST",
+                                     headers={"Content-Type": "application/json", "Authorization": AUTH})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return response.read()
+
+
+def fetch_store(base_url):
+    request = urllib.request.Request(f"{base_url}/api/snapshot", headers={"Authorization": AUTH})
+    with urllib.request.urlopen(request, timeout=120) as response:
+        return json.loads(response.read())["version"]
+
+
+def update_graph(base_url, store):
+    # A fresh graph: no figure state yet, so the server builds the full figure every time
+    return post_callback(
+        base_url,
+        [{"id": "multi-axis-graph", "property": "figure"}, {"id": "graph-extend", "property": "data"},
+         {"id": "column-selector", "property": "options"}, {"id": "figure-state", "property": "data"}],
+        [{"id": "column-selector", "property": "value", "value": ["close", "Close Prediction (1h)"]},
+         {"id": "data-store", "property": "data", "value": store},
+         {"id": "graph-view", "property": "data", "value": {"relayout": None, "width": 1000}}],
+        [{"id": "figure-state", "property": "data", "value": None}],
+    )
+
+
+def wait_for_server(base_url, timeout=120):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            urllib.request.urlopen(urllib.request.Request(base_url, headers={"Authorization": AUTH}), timeout=5)
+            return True
+        except OSError:
+            time.sleep(0.5)
+    return False
+
+
+def run_load(base_url, requests, concurrency):
+    store = fetch_store(base_url)
+
+    def timed(_):
+        start = time.perf_counter()
+        update_graph(base_url, store)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = sorted(executor.map(timed, range(requests)))
+    elapsed = time.perf_counter() - start
+    return {
+        "throughput": requests / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+def bench_mode(mode, port, requests, concurrency):
+    env = dict(os.environ, PORT=str(port))
+    server = subprocess.Popen(SERVER_COMMANDS[mode], cwd=APP_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        if not wait_for_server(base_url):
+            print(f"{mode}: server did not start")
+            return None
+        return run_load(base_url, requests, concurrency)
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare callback throughput of the dev server and gunicorn")
+    parser.add_argument("--mode", choices=["dev", "gunicorn", "both"], default="both")
+    parser.add_argument("--port", type=int, default=8050)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+
+    modes = ["dev", "gunicorn"] if args.mode == "both" else [args.mode]
+    for mode in modes:
+        result = bench_mode(mode, args.port, args.requests, args.concurrency)
+        if result:
+            print(f"{mode:>8}: {result['throughput']:7.1f} req/s  "
+                  f"p50 {result['p50_ms']:7.1f} ms  p95 {result['p95_ms']:7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
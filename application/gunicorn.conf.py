@@ -0,0 +1,24 @@
+import os
+
+# Production serving settings, all overridable from the task definition environment
+bind = f"0.0.0.0:{os.environ.get('PORT', '80')}"
+workers = int(os.environ.get("WEB_CONCURRENCY", "2"))
+# Open /api/events streams each park a thread (EVENTS_MAX_STREAMS per worker), the rest serve callbacks
+threads = int(os.environ.get("GUNICORN_THREADS", "16"))
+worker_class = "gthread"
+
+# Import the app and build the layout once in the master, then fork the workers
+preload_app = True
+
+# Recycle workers gracefully to bound memory growth on the 512 MB task
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", "100"))
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+
+# Must outlive the ALB idle_timeout (60 s in terraform/main.tf), otherwise the ALB
+# reuses connections the worker already closed and answers with 502s
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", "65"))
+
+accesslog = "-"
+errorlog = "-"
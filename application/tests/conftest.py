@@ -0,0 +1,27 @@
+import os
+import sys
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pytest
+
+# Run from the repository root or application/: python -m pytest application/tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Shared snapshots and other scratch files go to a throwaway directory, never /dev/shm/trading-app
+os.environ.setdefault("SNAPSHOT_DIR", tempfile.mkdtemp(prefix="trading-app-tests-"))
+os.environ.setdefault("AWS_DEFAULT_REGION", "eu-west-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+
+def minute_frame(end="2025-01-08", periods=60, columns=("close", "Close Prediction (1h)")):
+    # Small stand-in for a Timestream snapshot: one row per minute, one column per measure
+    index = pd.date_range(end=end, periods=periods, freq="min")
+    return pd.DataFrame({col: np.arange(periods, dtype=float) + i for i, col in enumerate(columns)}, index=index)
+
+
+@pytest.fixture
+def frame():
+    return minute_frame()
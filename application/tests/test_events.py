@@ -0,0 +1,48 @@
+import base64
+
+import pytest
+
+from conftest import minute_frame
+
+AUTH = {"Authorization": "Basic " + base64.b64encode(b"TradeAppUser:TradeApp2025").decode()}
+
+
+@pytest.fixture(scope="module")
+def web_app():
+    import web_app_timestream_v25 as web_app
+    web_app.poller.fetch = minute_frame  # never reach Timestream
+    return web_app
+
+
+def permits(web_app):
+    return web_app.event_streams._value
+
+
+def test_head_returns_the_stream_permit(web_app):
+    client = web_app.app.server.test_client()
+    before = permits(web_app)
+    response = client.head("/api/events", headers=AUTH)
+    assert response.status_code == 200
+    response.close()
+    assert permits(web_app) == before
+
+
+def test_closed_stream_returns_the_permit(web_app):
+    client = web_app.app.server.test_client()
+    before = permits(web_app)
+    response = client.get("/api/events", headers=AUTH, buffered=False)
+    assert next(response.response).startswith(b"retry:")
+    assert permits(web_app) == before - 1
+    response.close()
+    assert permits(web_app) == before
+
+
+def test_streams_over_the_limit_are_refused(web_app):
+    client = web_app.app.server.test_client()
+    open_streams = [client.get("/api/events", headers=AUTH, buffered=False) for _ in range(permits(web_app))]
+    try:
+        assert client.get("/api/events", headers=AUTH).status_code == 503
+    finally:
+        for response in open_streams:
+            response.close()
+    assert permits(web_app) == web_app.events_max_streams
@@ -0,0 +1,110 @@
+import io
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from app_helpers import export_history as eh
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+BUCKET = "export-bucket"
+RUN = f"s3://{BUCKET}/exports/run-1/"
+START, END = pd.Timestamp("2025-01-01"), pd.Timestamp("2025-01-02")
+
+
+@pytest.fixture
+def s3():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="eu-west-1")
+        client.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+        yield client
+
+
+class FakeUnload:
+    # timestream-query client answering UNLOAD with a manifest url, or failing like a real ClientError
+
+    def __init__(self, manifest_url=None, error=False):
+        self.manifest_url = manifest_url
+        self.error = error
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, QueryString):
+        if self.error:
+            raise eh.ClientError({"Error": {"Code": "ValidationException", "Message": "boom"}}, "Query")
+        columns = ["rows", "metadataFile", "manifestFile"]
+        values = ["4", f"{RUN}run_metadata.json", self.manifest_url]
+        return [{"ColumnInfo": [{"Name": name} for name in columns],
+                 "Rows": [{"Data": [{"ScalarValue": value} for value in values]}]}]
+
+
+def put_partition(s3, key, measures):
+    table = pa.table({"time": pd.date_range("2025-01-01", periods=len(measures), freq="min"),
+                      "measure_name": measures, "value": [float(i) for i in range(len(measures))]})
+    buffer = io.BytesIO()
+    pq.write_table(table, buffer)
+    s3.put_object(Bucket=BUCKET, Key=key, Body=buffer.getvalue())
+    return f"s3://{BUCKET}/{key}"
+
+
+def put_manifest(s3, urls):
+    key = "exports/run-1/run_manifest.json"
+    s3.put_object(Bucket=BUCKET, Key=key, Body=json.dumps({"result_files": [{"url": url} for url in urls]}).encode())
+    return f"s3://{BUCKET}/{key}"
+
+
+def test_manifest_is_the_source_of_truth(s3):
+    listed = put_partition(s3, "exports/run-1/results/part-a", ["close", "rsi"])
+    put_partition(s3, "exports/run-1/results/stray", ["close"])  # not in the manifest
+    assert eh.list_result_files(s3, put_manifest(s3, [listed]), RUN) == [listed]
+
+
+def test_prefix_listing_follows_the_unload_layout(s3):
+    # Data files without a .parquet suffix are found; the manifest and metadata at the root are not
+    urls = [put_partition(s3, "exports/run-1/results/q1_0_part", ["close"]),
+            put_partition(s3, "exports/run-1/results/q1_1_part.parquet", ["rsi"])]
+    put_manifest(s3, urls)
+    s3.put_object(Bucket=BUCKET, Key="exports/run-1/run_metadata.json", Body=b"{}")
+    put_partition(s3, "exports/run-2/results/other", ["close"])
+    assert eh.list_result_files(s3, None, RUN) == sorted(urls)
+
+
+def test_export_from_manifest(s3, tmp_path):
+    url = put_partition(s3, "exports/run-1/results/part", ["close", "rsi", "close", "rsi"])
+    out = tmp_path / "history.parquet"
+    table = eh.export_history(FakeUnload(put_manifest(s3, [url])), s3, "db", "table", START, END, RUN, out)
+    assert table.num_rows == 4 and pq.read_table(out).num_rows == 4
+
+    wide = tmp_path / "wide.parquet"
+    eh.export_history(FakeUnload(put_manifest(s3, [url])), s3, "db", "table", START, END, RUN, wide, wide=True)
+    assert sorted(pd.read_parquet(wide).columns) == ["close", "rsi"]
+
+
+def test_failed_unload_writes_nothing(s3, tmp_path, capsys):
+    put_partition(s3, "exports/run-1/results/part", ["close"])
+    out = tmp_path / "history.parquet"
+    assert eh.export_history(FakeUnload(error=True), s3, "db", "table", START, END, RUN, out) is None
+    assert not out.exists()
+    assert "did not finish" in capsys.readouterr().out
+
+
+def test_failed_unload_salvaged_only_when_allowed(s3, tmp_path, capsys):
+    put_partition(s3, "exports/run-1/results/part", ["close", "rsi"])
+    out = tmp_path / "history.parquet"
+    table = eh.export_history(FakeUnload(error=True), s3, "db", "table", START, END, RUN, out, allow_partial=True)
+    assert table.num_rows == 2 and out.exists()
+    assert "INCOMPLETE" in capsys.readouterr().out
+
+
+def test_main_exits_non_zero_on_failure(monkeypatch):
+    monkeypatch.setattr(eh, "export_history", lambda *args: None)
+    monkeypatch.setattr(eh.boto3, "client", lambda *args, **kwargs: None)
+    monkeypatch.setattr("sys.argv", ["export_history", "--s3-url", RUN])
+    with pytest.raises(SystemExit) as exit_info:
+        eh.main()
+    assert exit_info.value.code == 1
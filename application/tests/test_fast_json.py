@@ -0,0 +1,57 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app_helpers import fast_json
+
+orjson = pytest.importorskip("orjson")
+
+
+def roundtrip(obj):
+    return json.loads(fast_json.dumps(obj))
+
+
+def test_numeric_arrays_and_nan():
+    assert roundtrip({"y": np.array([1.5, np.nan]), "n": np.arange(3)}) == {"y": [1.5, None], "n": [0, 1, 2]}
+    assert roundtrip(np.arange(6.0).reshape(2, 3)[:, 1]) == [1.0, 4.0]  # not contiguous
+
+
+def test_numeric_arrays_are_not_converted_to_lists():
+    assert isinstance(fast_json.default(np.arange(3)), orjson.Fragment)
+    assert isinstance(fast_json.default(pd.Series([1.0, 2.0])), orjson.Fragment)
+
+
+@pytest.mark.parametrize("unit", ["ns", "us", "ms", "s"])
+def test_datetime_units(unit):
+    values = np.array(["2025-01-01T00:00:00", "2025-01-02T12:30:00"], dtype=f"datetime64[{unit}]")
+    assert pd.to_datetime(roundtrip(values)).equals(pd.DatetimeIndex(values.astype("datetime64[ns]")))
+
+
+@pytest.mark.parametrize("unit", ["ns", "us", "ms", "s", "D"])
+def test_nat_is_null(unit):
+    values = np.array(["2025-01-01", "NaT"], dtype=f"datetime64[{unit}]")
+    encoded = roundtrip({"x": values, "scalar": values[1]})
+    assert encoded["x"][1] is None and encoded["scalar"] is None
+    assert pd.Timestamp(encoded["x"][0]) == pd.Timestamp("2025-01-01")
+
+
+def test_datetime_series_and_index_are_dates():
+    index = pd.date_range("2025-01-01", periods=3, freq="min")
+    series = pd.Series([1.0, 2.0, None], index=index)
+    for values in (index, series.index, pd.Series(index), pd.Series([index[0], pd.NaT])):
+        encoded = roundtrip(values)
+        assert all(value is None or isinstance(value, str) for value in encoded)
+        assert pd.Timestamp(encoded[0]) == index[0]
+
+
+def test_timezone_aware_index():
+    index = pd.date_range("2025-01-01", periods=2, freq="h", tz="UTC")
+    assert [pd.Timestamp(value) for value in roundtrip(index)] == list(index)
+
+
+def test_script_breaking_characters_are_escaped():
+    out = fast_json.dumps({"text": "</script>\u2028"})
+    assert "</script>" not in out and "\u2028" not in out
+    assert json.loads(out) == {"text": "</script>\u2028"}
@@ -0,0 +1,77 @@
+import pandas as pd
+
+from app_helpers.get_from_db import query_last_days, query_last_days_series, series_to_frame
+
+
+class FakeTimestream:
+    # Minimal timestream-query client: one page per query, recorded for inspection
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.queries = []
+
+    def get_paginator(self, name):
+        return self
+
+    def paginate(self, QueryString):
+        self.queries.append(QueryString)
+        return self.pages
+
+
+def scalar(value):
+    return {"NullValue": True} if value is None else {"ScalarValue": str(value)}
+
+
+def pivot_page():
+    # SELECT * rows: one record per measure and time, each type in its own measure_value column
+    columns = ["time", "measure_name", "measure_value::double", "measure_value::bigint", "measure_value::boolean"]
+    rows = [
+        ["2025-01-01 00:00:00.000000000", "close", 1.5, None, None],
+        ["2025-01-01 00:00:00.000000000", "volume", None, 12, None],
+        ["2025-01-01 00:01:00.000000000", "close", 2.5, None, None],
+        ["2025-01-01 00:01:00.000000000", "volume", None, 7, None],
+    ]
+    return {"ColumnInfo": [{"Name": name} for name in columns],
+            "Rows": [{"Data": [scalar(value) for value in row]} for row in rows]}
+
+
+def series_page():
+    points = [{"Time": f"2025-01-01 00:0{minute}:00.000000000", "Value": scalar(value)}
+              for minute, value in ((1, 2.5), (0, 1.5))]
+    return {"ColumnInfo": [{"Name": "measure_name"}, {"Name": "series"}],
+            "Rows": [{"Data": [scalar("close"), {"TimeSeriesValue": points}]}]}
+
+
+def test_pivot_keeps_every_measure_type():
+    df = query_last_days(FakeTimestream([pivot_page()]), "db", "table", 7)
+    df = df.apply(pd.to_numeric, errors="coerce")
+    assert sorted(df.columns) == ["close", "volume"]
+    assert df["volume"].tolist() == [12, 7]
+
+
+def test_series_query_sorts_points():
+    client = FakeTimestream([series_page()])
+    df = series_to_frame(query_last_days_series(client, "db", "table", 7))
+    assert "CREATE_TIME_SERIES" in client.queries[0]
+    assert df["close"].tolist() == [1.5, 2.5]
+    assert df.index.is_monotonic_increasing
+
+
+def test_load_frame_defaults_to_pivot(monkeypatch):
+    import web_app_timestream_v25 as web_app
+    client = FakeTimestream([pivot_page()])
+    monkeypatch.setattr(web_app, "timestream_client", client)
+    monkeypatch.setattr(web_app, "timestream_query_mode", "pivot")
+    df = web_app.load_frame()
+    assert list(df.columns) == ["close", "volume"]
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert "CREATE_TIME_SERIES" not in client.queries[0]
+
+
+def test_load_frame_series_falls_back_to_pivot(monkeypatch):
+    import web_app_timestream_v25 as web_app
+    client = FakeTimestream([pivot_page()])
+    monkeypatch.setattr(web_app, "timestream_client", client)
+    monkeypatch.setattr(web_app, "timestream_query_mode", "series")
+    monkeypatch.setattr(web_app, "query_last_days_series", lambda *args: None)
+    assert list(web_app.load_frame().columns) == ["close", "volume"]
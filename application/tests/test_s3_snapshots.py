@@ -0,0 +1,103 @@
+import time
+
+import pytest
+
+from app_helpers.s3_snapshots import S3Snapshots
+from app_helpers.shared_snapshots import SharedSnapshots
+from app_helpers.snapshot_poller import Snapshot, SnapshotPoller
+from conftest import minute_frame
+
+moto = pytest.importorskip("moto")
+boto3 = pytest.importorskip("boto3")
+
+BUCKET = "snapshot-bucket"
+
+
+@pytest.fixture
+def s3():
+    with moto.mock_aws():
+        client = boto3.client("s3", region_name="eu-west-1")
+        client.create_bucket(Bucket=BUCKET, CreateBucketConfiguration={"LocationConstraint": "eu-west-1"})
+        yield client
+
+
+def test_one_task_holds_the_lease(s3):
+    first, second = S3Snapshots(s3, BUCKET, owner="task-a"), S3Snapshots(s3, BUCKET, owner="task-b")
+    assert first.try_lead()
+    assert not second.try_lead()
+    assert first.try_lead()  # renewal
+
+
+def test_expired_lease_is_taken_over(s3):
+    first = S3Snapshots(s3, BUCKET, owner="task-a", lease_seconds=-1)
+    assert first.try_lead()
+    assert S3Snapshots(s3, BUCKET, owner="task-b").try_lead()
+    assert not S3Snapshots(s3, BUCKET, owner="task-a").try_lead()
+
+
+def test_conditional_put_decides_a_race(s3):
+    # Both tasks saw no lease; only the first conditional create may succeed
+    first, second = S3Snapshots(s3, BUCKET, owner="task-a"), S3Snapshots(s3, BUCKET, owner="task-b")
+    real_get = s3.get_object
+    lease_missing = s3.exceptions.NoSuchKey({"Error": {"Code": "NoSuchKey", "Message": ""}}, "GetObject")
+
+    def no_lease_yet(**kwargs):
+        if kwargs["Key"] == first.lease_key:
+            raise lease_missing
+        return real_get(**kwargs)
+
+    s3.get_object = no_lease_yet
+    try:
+        assert first.try_lead()
+        assert not second.try_lead()
+    finally:
+        s3.get_object = real_get
+
+
+def test_followers_pull_new_versions(s3):
+    leader, follower = S3Snapshots(s3, BUCKET, owner="task-a"), S3Snapshots(s3, BUCKET, owner="task-b")
+    assert follower.fetch_newer() is None
+    df = minute_frame()
+    leader.publish(Snapshot("v1", df, time.time()))
+    pulled = follower.fetch_newer()
+    assert pulled.version == "v1" and pulled.data.equals(df)
+    assert follower.fetch_newer("v1") is None  # 304 on the pointer
+
+
+def test_local_publish_survives_s3_failure(s3, tmp_path, capsys):
+    remote = S3Snapshots(s3, BUCKET, owner="task-a")
+    poller = SnapshotPoller(minute_frame, shared=SharedSnapshots(str(tmp_path)), remote=remote)
+    real_put = s3.put_object
+
+    def snapshots_unwritable(**kwargs):
+        if kwargs["Key"] != remote.lease_key:
+            raise remote.s3.exceptions.ClientError({"Error": {"Code": "SlowDown", "Message": "throttled"}},
+                                                   "PutObject")
+        return real_put(**kwargs)
+
+    s3.put_object = snapshots_unwritable
+    try:
+        snapshot = poller.refresh()
+    finally:
+        s3.put_object = real_put
+    assert snapshot is not None
+    assert poller.shared.current_version() == snapshot.version
+    assert "Error publishing snapshot" in capsys.readouterr().out
+    assert S3Snapshots(s3, BUCKET, owner="task-b").fetch_newer() is None
+
+
+def test_publish_goes_local_then_s3(s3, tmp_path):
+    remote = S3Snapshots(s3, BUCKET, owner="task-a")
+    shared = SharedSnapshots(str(tmp_path))
+    poller = SnapshotPoller(minute_frame, shared=shared, remote=remote)
+    order = []
+    real_publish = remote.publish
+
+    def record(snapshot):
+        order.append(("s3", shared.current_version()))
+        real_publish(snapshot)
+
+    remote.publish = record
+    snapshot = poller.refresh()
+    assert order == [("s3", snapshot.version)]  # already current locally when S3 is written
+    assert S3Snapshots(s3, BUCKET, owner="task-b").fetch_newer().version == snapshot.version
@@ -1,11 +1,28 @@
-from dash import Dash, dcc, html, Input, Output
+from dash import Dash, dcc, html, Input, Output, State, ClientsideFunction, ctx, no_update
 import plotly.graph_objects as go
 import plotly.io as pio
 import pandas as pd
 import numpy as np
 import boto3
+import os
 import dash_auth
-from app_helpers.get_from_db import query_last_days
+import json
+import threading
+import time
+from flask import Response, request
+from flask_compress import Compress
+from app_helpers import fast_json
+from app_helpers.export_history import s3_client_from_env
+from app_helpers.figure_cache import FigureCache, encoded_figure
+from app_helpers.figure_builder import (appended_rows, build_figure, column_options, default_axes, epoch_ms,
+                                        extend_data, patch_columns, relayout_range, trace_delta, trace_payload,
+                                        use_webgl, view_slice)
+from app_helpers.get_from_db import query_last_days, query_last_days_series, series_to_frame
+from app_helpers.http_cache import conditional_json, etag_for
+from app_helpers.response_metrics import ResponseMetrics
+from app_helpers.s3_snapshots import S3Snapshots
+from app_helpers.shared_snapshots import SharedSnapshots
+from app_helpers.snapshot_poller import SnapshotPoller
 
 # Define authorized users
 VALID_USERNAME_PASSWORD_PAIRS = {
@@ -17,11 +34,56 @@ timestream_client = boto3.client("timestream-query", region_name="eu-west-1")
 database_name = "my-timestream-database"
 table_name = "TestTable"
 days = 7
+# "pivot" reads every measure_value type as rows; "series" (CREATE_TIME_SERIES, one row per measure)
+# transfers far less but only covers DOUBLE measures, so BIGINT and BOOLEAN measures are left out
+timestream_query_mode = os.environ.get("TIMESTREAM_QUERY_MODE", "pivot")
+
+# Background refresh, aligned a few seconds after the bot's once-a-minute writes
+poll_interval = 60
+poll_offset = 10
+poll_idle_timeout = 10 * 60  # pause polling when no session has been active for this long
+
+# Set when running several ECS tasks: one task refreshes and the others pull its snapshots from S3
+snapshot_bucket = os.environ.get("SNAPSHOT_BUCKET")
+
+# Load every candidate trace once and switch columns in the browser (assets/dashboard.js)
+clientside_traces = os.environ.get("CLIENTSIDE_TRACES", "0") == "1"
+
+# Viewport-aware resampling of the server-rendered graph
+downsample_method = "minmax"  # or "lttb"; both keep the exact peaks
+default_graph_width = 1000  # pixels, until the browser reports the real width
+resample_after = 30  # raw points appended to a downsampled figure before it is resampled
+
+# Columns the Strategy View opens with, prebuilt into the page for the latest snapshot
+default_columns = ["close", "Close Prediction (1h)"]
+
+# Total points above which traces switch from SVG Scatter to WebGL Scattergl
+webgl_point_threshold = int(os.environ.get("WEBGL_POINT_THRESHOLD", 20000))
+
+# Encoded figures shared by every session viewing the same snapshot, columns and view, per worker
+figure_cache_bytes = int(os.environ.get("FIGURE_CACHE_MB", 32)) * 1024 * 1024
+
+# Server-sent events: each open stream parks one gunicorn thread, so streams per worker are capped
+# below GUNICORN_THREADS and the rest of the sessions keep polling /api/snapshot
+events_max_streams = int(os.environ.get("EVENTS_MAX_STREAMS", 12))
+events_heartbeat = 20  # seconds; comment lines keep the ALB (idle_timeout 60) from closing quiet streams
+events_max_age = 10 * 60  # streams end after this and the browser reconnects, so threads are recycled
+events_retry_ms = 5000
+
+# Response compression: brotli, gzip for clients without it. Levels stay low for the 0.25 vCPU task,
+# and bodies under the threshold (extendData, patches of a few points) are sent as they are.
+compress_algorithms = ["br", "gzip"]
+compress_br_level = int(os.environ.get("COMPRESS_BR_LEVEL", 4))
+compress_gzip_level = int(os.environ.get("COMPRESS_GZIP_LEVEL", 1))
+compress_min_size = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
 
 # Set Plotly Theme
 plotly_theme = "plotly"
 pio.templates.default = plotly_theme
 
+# Encode every Dash response with orjson and no fallback to plotly's per-value clean-up
+fast_json.install()
+
 # Define a custom blue colour palette
 custom_blue_colors = [
     "#1f77b4", "#aec7e8", "rgba(174, 199, 232, 0.3)", "#005b96", "#539ecd"
@@ -35,79 +97,269 @@ dark_blue = "#333333"
 app = Dash(__name__)
 auth = dash_auth.BasicAuth(app, VALID_USERNAME_PASSWORD_PAIRS)
 
+app.server.config.update(
+    COMPRESS_ALGORITHM=compress_algorithms,
+    COMPRESS_ALGORITHM_STREAMING=["br"],
+    COMPRESS_BR_LEVEL=compress_br_level,
+    COMPRESS_LEVEL=compress_gzip_level,
+    COMPRESS_MIN_SIZE=compress_min_size,
+)
+# Raw and sent sizes per route kind at /metrics; the hooks wrap Compress because after_request runs in reverse
+response_metrics = ResponseMetrics()
+app.server.after_request(response_metrics.record_sent)
+Compress(app.server)
+app.server.after_request(response_metrics.record_raw)
+app.server.add_url_rule('/metrics', 'metrics', response_metrics.view)
+
 app.title = "Trading Application"
 
-app.layout = html.Div([
-    dcc.Interval(id='interval-component', interval=60 * 1000, n_intervals=0),  # Query every minute
-    dcc.Store(id='data-store', data=None),  # Store queried data in memory
-
-    html.Div(
-        className="header-container",
-        children=[
-            html.H1("Trading Application Dashboard", className="ui header", style={"color": dark_blue}),
-            html.P("Select View", className="ui sub header", style={"color": dark_blue}),
-        ],
-        style={
-            "textAlign": "center", "backgroundColor": custom_blue_colors[2], "color": dark_blue,
-            "padding": "30px", "borderBottom": f"3px solid {dark_blue}", "borderRadius": "15px"
-        },
-    ),
-
-    html.Div(
-        className="ui segment",
-        children=[
-            dcc.Tabs(id='tabs', value='graph-tab', children=[
-                dcc.Tab(label='Strategy View', value='graph-tab', style={"color": dark_blue, "border": "none"},
-                        selected_style={"backgroundColor": 'rgba(0,0,0,0)', "color": dark_blue, "border": "none"}),
-                dcc.Tab(label='Information Feed View', value='news-tab', style={"color": dark_blue, "border": "none"},
-                        selected_style={"backgroundColor": 'rgba(0,0,0,0)', "color": dark_blue, "border": "none"})
-            ], style={}),
-
-            html.Div(id='tabs-content', className='ui padded segment', style={"padding": "10px"})
-        ],
-        style={"margin": "20px", "marginTop": "20px", "backgroundColor": custom_blue_colors[2]}
-    ),
-
-    html.Div(
-        className="footer-container",
-        children=[
-            html.P("Developed by Liam Richardson - 2025", style={"color": dark_blue, "textAlign": "center"}),
-            html.P("For inquiries, contact: liampgrichardson@gmail.com", style={"color": dark_blue, "textAlign": "center"}),
-            html.A("Connect on LinkedIn", href="https://www.linkedin.com/in/liam-richardson/", target="_blank",
-                   style={"color": dark_blue, "textAlign": "center", "display": "block"})
-        ],
-        style={
-            "textAlign": "center", "backgroundColor": custom_blue_colors[2], "color": dark_blue,
-            "padding": "10px", "borderTop": f"3px solid {dark_blue}", "borderRadius": "15px", "marginTop": "20px"
-        }
-    )
-])
+# Browser-side copy of every trace, cached in IndexedDB under the table and window it covers and kept
+# current by deltas from /api/traces and /api/events
+trace_cache_key = f"{database_name}/{table_name}/{days}d"
+trace_stores = [
+    dcc.Store(id='trace-cache-key', data=trace_cache_key),
+    dcc.Store(id='trace-delta', data=None),
+    dcc.Store(id='trace-store', data=None),
+    dcc.Store(id='trace-version', data=None),
+] if clientside_traces else []
 
-# Callback to fetch data every minute and store it in memory
-@app.callback(
+# Built for every page load: the latest published snapshot and its default figure come with the page,
+# so the first chart needs no callback round trip. Never waits for Timestream; on a cold start the
+# page comes up empty and the first snapshot arrives through /api/events or the snapshot-retry poll.
+def serve_layout():
+    version = poller.current_version()
+    snapshot = poller.get(version) if version else None
+    version = snapshot.version if snapshot is not None else None
+    return html.Div([
+        dcc.Interval(id='interval-component', interval=60 * 1000, n_intervals=0),  # Query every minute
+        dcc.Store(id='page-visible', data=True),  # Page Visibility API state, set from assets/dashboard.js
+        dcc.Store(id='data-store', data=version),  # Snapshot version id; the data itself stays on the server
+        # Polls /api/snapshot every few seconds while nothing is published and the event stream is refused
+        dcc.Interval(id='snapshot-retry', interval=events_retry_ms, n_intervals=0, disabled=True),
+        *trace_stores,
+
+        html.Div(
+            className="header-container",
+            children=[
+                html.H1("Trading Application Dashboard", className="ui header", style={"color": dark_blue}),
+                html.P("Select View", className="ui sub header", style={"color": dark_blue}),
+                html.Div(f"Loading {days} days of data from Timestream...", id='snapshot-status',
+                         className="ui small message", style={"display": "none" if version else "block"}),
+            ],
+            style={
+                "textAlign": "center", "backgroundColor": custom_blue_colors[2], "color": dark_blue,
+                "padding": "30px", "borderBottom": f"3px solid {dark_blue}", "borderRadius": "15px"
+            },
+        ),
+
+        html.Div(
+            className="ui segment",
+            children=[
+                dcc.Tabs(id='tabs', value='graph-tab', children=[
+                    dcc.Tab(label='Strategy View', value='graph-tab', style={"color": dark_blue, "border": "none"},
+                            selected_style={"backgroundColor": 'rgba(0,0,0,0)', "color": dark_blue, "border": "none"}),
+                    dcc.Tab(label='Information Feed View', value='news-tab', style={"color": dark_blue, "border": "none"},
+                            selected_style={"backgroundColor": 'rgba(0,0,0,0)', "color": dark_blue, "border": "none"})
+                ], style={}),
+
+                html.Div(graph_tab(snapshot), id='tabs-content', className='ui padded segment',
+                         style={"padding": "10px"})
+            ],
+            style={"margin": "20px", "marginTop": "20px", "backgroundColor": custom_blue_colors[2]}
+        ),
+
+        html.Div(
+            className="footer-container",
+            children=[
+                html.P("Developed by Liam Richardson - 2025", style={"color": dark_blue, "textAlign": "center"}),
+                html.P("For inquiries, contact: liampgrichardson@gmail.com", style={"color": dark_blue, "textAlign": "center"}),
+                html.A("Connect on LinkedIn", href="https://www.linkedin.com/in/liam-richardson/", target="_blank",
+                       style={"color": dark_blue, "textAlign": "center", "display": "block"})
+            ],
+            style={
+                "textAlign": "center", "backgroundColor": custom_blue_colors[2], "color": dark_blue,
+                "padding": "10px", "borderTop": f"3px solid {dark_blue}", "borderRadius": "15px", "marginTop": "20px"
+            }
+        )
+    ])
+
+def load_frame():
+    print("Fetching data from database...")
+    df = None
+    if timestream_query_mode == "series":
+        df = series_to_frame(query_last_days_series(timestream_client, database_name, table_name, days))
+        if df is None:
+            print("Series query returned nothing, falling back to the pivot query")
+    if df is None:
+        df = query_last_days(timestream_client, database_name, table_name, days)
+        if df is None:
+            return None
+        # Same frame as the series path: a time index and measures in name order
+        df.index = pd.to_datetime(df.index)
+        df = df.sort_index(axis=1)
+    return df.apply(pd.to_numeric, errors='coerce').dropna(axis=1, how='all')
+
+
+# One poller across all workers (and tasks) queries Timestream and publishes to shared memory;
+# sessions in every worker read the latest mapped snapshot
+poller = SnapshotPoller(load_frame, interval=poll_interval, offset=poll_offset, idle_timeout=poll_idle_timeout,
+                        shared=SharedSnapshots(),
+                        remote=S3Snapshots(s3_client_from_env(), snapshot_bucket) if snapshot_bucket else None)
+figure_cache = FigureCache(figure_cache_bytes)
+
+
+# Read endpoints with strong ETags: a poll for an unchanged snapshot or view gets an empty 304
+@app.server.route('/api/snapshot')
+def snapshot_endpoint():
+    # Never waits: on a cold start the browser gets a 503 and retries every few seconds
+    snapshot = poller.latest(timeout=0)
+    if snapshot is None:
+        return Response(status=503, headers={'Retry-After': str(events_retry_ms // 1000)})
+    # The version is the tag, so the browser can send it back without keeping the response around
+    return conditional_json(snapshot.version, lambda: json.dumps(
+        {'version': snapshot.version, 'fetched_at': snapshot.fetched_at}))
+
+
+def bad_request(message):
+    return Response(json.dumps({'error': message}), status=400, mimetype='application/json')
+
+
+@app.server.route('/api/figure')
+def figure_endpoint():
+    # ?columns=close&columns=...&start=...&end=...&width=...&version=..., defaulting to the latest snapshot
+    version = request.args.get('version')
+    snapshot = poller.get(version) if version else poller.latest(timeout=0)
+    if snapshot is None:
+        return Response(status=503, headers={'Retry-After': str(events_retry_ms // 1000)})
+    selected_columns = request.args.getlist('columns')
+    missing = [col for col in selected_columns if col not in snapshot.data.columns]
+    if missing:
+        return bad_request(f"Unknown columns: {missing}")
+    x_range = None
+    if 'start' in request.args or 'end' in request.args:
+        x_range = [request.args.get('start'), request.args.get('end')]
+        try:
+            bounds = [pd.Timestamp(bound) for bound in x_range]
+        except (TypeError, ValueError):
+            return bad_request(f"Invalid range: {x_range}")
+        if pd.isna(bounds[0]) or pd.isna(bounds[1]) or bounds[0] > bounds[1]:
+            return bad_request(f"Invalid range: {x_range}")
+    width = request.args.get('width', default_graph_width, type=int)
+    if width <= 0:
+        return bad_request(f"Invalid width: {request.args.get('width')}")
+    return conditional_json(etag_for(snapshot.version, selected_columns, x_range, width),
+                            lambda: cached_figure(snapshot, selected_columns, x_range, width))
+
+
+@app.server.route('/api/traces')
+def traces_endpoint():
+    # ?version=<cached version>&since=<last cached time, epoch ms>: only the rows the browser is missing,
+    # or every trace when it has none or its copy cannot be extended
+    snapshot = poller.latest(timeout=0)
+    if snapshot is None:
+        return Response(status=503, headers={'Retry-After': str(events_retry_ms // 1000)})
+    version = request.args.get('version')
+    since = request.args.get('since', type=int)
+    return conditional_json(etag_for(snapshot.version, version, since),
+                            lambda: fast_json.dumps(traces_since(snapshot, version, since)))
+
+
+event_streams = threading.BoundedSemaphore(events_max_streams)
+
+
+@app.server.route('/api/events')
+def events_endpoint():
+    # One 'snapshot' event per new version, carrying the appended rows in clientside mode. The version
+    # is the event id, so a reconnecting EventSource resumes from Last-Event-ID.
+    if not event_streams.acquire(blocking=False):
+        return Response(status=503)
+    version = request.headers.get('Last-Event-ID') or request.args.get('version')
+
+    def stream(current):
+        yield f"retry: {events_retry_ms}\n\n"
+        deadline = time.monotonic() + events_max_age
+        while time.monotonic() < deadline:
+            snapshot = poller.wait_for_change(current, events_heartbeat)
+            if snapshot is None:
+                yield ": heartbeat\n\n"
+                continue
+            event = {'version': snapshot.version}
+            if clientside_traces and current is not None:
+                event['traces'] = traces_delta(snapshot, current)
+            yield f"id: {snapshot.version}\nevent: snapshot\ndata: {fast_json.dumps(event)}\n\n"
+            current = snapshot.version
+
+    response = Response(stream(version), mimetype='text/event-stream',
+                        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+    # The server closes every response, also when the body is never iterated (HEAD, a client gone
+    # before the first chunk), so the permit goes back here rather than in the generator
+    response.call_on_close(event_streams.release)
+    return response
+
+
+# Clientside refresh: picks up the latest snapshot version every minute through /api/snapshot,
+# where an unchanged version costs a 304 and no callback round trip. Skipped while /api/events is connected.
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='refreshSnapshot'),
     Output('data-store', 'data'),
-    Input('interval-component', 'n_intervals')
+    [Input('interval-component', 'n_intervals'), Input('snapshot-retry', 'n_intervals')],
+    State('data-store', 'data')
 )
-def fetch_data(n):
-    print("Fetching data from database...")
-    df = query_last_days(timestream_client, database_name, table_name, days)
-    df = df.apply(pd.to_numeric, errors='coerce').dropna(axis=1, how='all')
-    return df.to_json(orient='split')  # Store DataFrame as JSON
 
 
-# Callback to update content when switching tabs
+# Cold start: the loading message and the fast retry stay on until the first version is in
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='snapshotStatus'),
+    [Output('snapshot-status', 'style'), Output('snapshot-retry', 'disabled')],
+    Input('data-store', 'data'),
+    prevent_initial_call=True
+)
+
+
+# Pause refreshing while the page is hidden or another tab is open, so server work follows actual viewers
+app.clientside_callback(
+    ClientsideFunction(namespace='dashboard', function_name='pauseRefresh'),
+    [Output('interval-component', 'disabled'), Output('interval-component', 'n_intervals')],
+    [Input('page-visible', 'data'), Input('tabs', 'value')],
+    State('interval-component', 'n_intervals')
+)
+
+
+# Strategy View with the default figure for snapshot already in place, or an empty graph until there is one
+def graph_tab(snapshot):
+    figure = {'layout': {'plot_bgcolor': 'rgba(0,0,0,0)', 'paper_bgcolor': 'rgba(0,0,0,0)'}}
+    selected_columns, options, state = default_columns, [], None
+    if snapshot is not None:
+        df = snapshot.data
+        selected_columns = [col for col in default_columns if col in df.columns]
+        max_points = 2 * default_graph_width
+        figure = encoded_figure(cached_figure(snapshot, selected_columns, None, default_graph_width))
+        options = column_options(df)
+        # Same state update_graph leaves after a full render, so the next refresh can extend this figure
+        state = {'version': snapshot.version, 'columns': selected_columns, 'range': None,
+                 'width': default_graph_width, 'downsampled': len(df) > max_points, 'appended': 0,
+                 'webgl': use_webgl(df, selected_columns, max_points, webgl_point_threshold),
+                 'axes': default_axes(selected_columns)}
+    return html.Div([
+        dcc.Graph(id='multi-axis-graph', config={'displayModeBar': True}, figure=figure),
+        dcc.Dropdown(id='column-selector', multi=True, placeholder="Select columns", value=selected_columns,
+                     options=options, className="ui dropdown"),
+        dcc.Store(id='figure-state', data=state),  # Version and columns the graph currently shows
+        dcc.Store(id='graph-view', data=None),  # Latest zoom/pan event and the graph's pixel width
+        dcc.Store(id='graph-extend', data=None),  # New points, applied by dashboard.extendFigure
+    ], className="ui raised segment")
+
+
+# Callback to update content when switching tabs. The page arrives with the Strategy View rendered.
 @app.callback(
     Output('tabs-content', 'children'),
-    Input('tabs', 'value')
+    Input('tabs', 'value'),
+    State('data-store', 'data'),
+    prevent_initial_call=True
 )
-def render_content(tab):
+def render_content(tab, version):
     if tab == 'graph-tab':
-        return html.Div([
-            dcc.Graph(id='multi-axis-graph', config={'displayModeBar': True},
-                      figure={'layout': {'plot_bgcolor': 'rgba(0,0,0,0)', 'paper_bgcolor': 'rgba(0,0,0,0)'}}),
-            dcc.Dropdown(id='column-selector', multi=True, placeholder="Select columns", value=["close", "Close Prediction (1h)"],
-                         className="ui dropdown"),
-        ], className="ui raised segment")
+        return graph_tab(poller.get(version) if version else None)
     elif tab == 'news-tab':
         return html.Div([
             html.H3("Latest News Headlines", className="ui header", style={"color": dark_blue}),
@@ -122,38 +374,156 @@ def render_content(tab):
 
 
 # Callback to update graph and dropdown from stored data
-@app.callback(
-    [Output('multi-axis-graph', 'figure'),
-     Output('column-selector', 'options')],
-    [Input('column-selector', 'value'),
-     Input('data-store', 'data')]  # Use stored data instead of re-querying
-)
-def update_graph(selected_columns, data_json):
-    if data_json is None:
-        return go.Figure(), []
-
-    df = pd.read_json(data_json, orient='split')
-
-    options = [{'label': col.lower(), 'value': col} for col in df.select_dtypes(include=[np.number]).columns]
-    fig = go.Figure()
-
-    if selected_columns:
-        y_axes = {'yaxis': {'title': selected_columns[0]}}
-        for i, col in enumerate(selected_columns):
-            fig.add_trace(go.Scatter(x=df.index, y=df[col], mode='lines', name=col, yaxis=f'y{i + 1}'))
-            if i > 0:
-                y_axes[f'yaxis{i + 1}'] = {'title': col, 'anchor': 'free', 'overlaying': 'y', 'autoshift': True}
-        fig.update_layout(template=plotly_theme, xaxis={'title': "Datetime", 'type': 'date'}, **y_axes)
-
-    fig.update_layout(
-        plot_bgcolor='rgba(0,0,0,0)',
-        paper_bgcolor='rgba(0,0,0,0)',
-        margin=dict(l=40, r=40, t=60, b=60, pad=0),
-        showlegend=True
+def update_graph(selected_columns, version, graph_view, figure_state):
+    if version is None:
+        return go.Figure(), no_update, [], None
+
+    snapshot = poller.get(version)
+    if snapshot is None:
+        # Nothing published yet; refreshSnapshot sets data-store again once there is
+        return no_update, no_update, no_update, no_update
+    df = snapshot.data
+    graph_view = graph_view or {}
+    x_range = figure_state.get('range') if figure_state else None
+    width = graph_view.get('width') or (figure_state or {}).get('width') or default_graph_width
+
+    # Zoom, pan or resize: re-resolve the visible range, ignore y-only zooms and small resizes
+    if ctx.triggered_id == 'graph-view' and figure_state:
+        requested = relayout_range(graph_view.get('relayout'))
+        if requested is None and abs(width - figure_state['width']) < 0.25 * figure_state['width']:
+            return no_update, no_update, no_update, no_update
+        if requested is not None:
+            x_range = None if requested == 'reset' else requested
+
+    max_points = 2 * width  # about two points per pixel is all the graph can show
+    view = view_slice(df, x_range)
+    webgl = use_webgl(view, selected_columns, max_points, webgl_point_threshold)
+    new_state = {'version': snapshot.version, 'columns': selected_columns, 'range': x_range, 'width': width,
+                 'downsampled': len(view) > max_points, 'appended': 0, 'webgl': webgl}
+
+    # Only new data for the same columns: append the new points instead of resending the figure
+    if (selected_columns and figure_state and ctx.triggered_id == 'data-store' and x_range is None
+            and figure_state['columns'] == selected_columns):
+        previous = poller.get(figure_state['version'])
+        if previous is not None and previous.version == figure_state['version']:
+            rows = appended_rows(previous.data, df, selected_columns)
+            # A downsampled figure takes raw points at its end until it is due for resampling
+            appended = figure_state['appended'] + len(rows) if rows is not None else 0
+            if rows is not None and (not figure_state['downsampled'] or appended < resample_after):
+                options = no_update if previous.data.columns.equals(df.columns) else column_options(df)
+                new_state.update(axes=figure_state['axes'], downsampled=figure_state['downsampled'],
+                                 appended=appended, webgl=figure_state['webgl'])
+                max_extend = None if figure_state['downsampled'] else len(df)
+                return no_update, extend_data(rows, selected_columns, max_extend), options, new_state
+
+    # One column added or removed on the same data: patch that trace and axis, leave the rest alone
+    if (figure_state and ctx.triggered_id == 'column-selector' and figure_state['version'] == snapshot.version
+            and figure_state['range'] == x_range and figure_state['width'] == width
+            and figure_state['webgl'] == webgl):
+        patched = patch_columns(view, figure_state['columns'], selected_columns, figure_state['axes'], max_points,
+                                downsample_method, webgl)
+        if patched is not None:
+            patch, new_state['axes'] = patched
+            new_state.update(downsampled=figure_state['downsampled'], appended=figure_state['appended'])
+            return patch, no_update, no_update, new_state
+
+    new_state['axes'] = default_axes(selected_columns)
+    encoded = cached_figure(snapshot, selected_columns, x_range, width)
+    return encoded_figure(encoded), no_update, column_options(df), new_state
+
+
+def cached_figure(snapshot, selected_columns, x_range, width):
+    # Encoded figure for one view of a snapshot, shared by update_graph and /api/figure
+    max_points = 2 * width
+    view = view_slice(snapshot.data, x_range)
+    webgl = use_webgl(view, selected_columns, max_points, webgl_point_threshold)
+    key = figure_cache.key(snapshot.version, selected_columns, x_range, width)
+    return figure_cache.encoded(key, lambda: build_figure(view, selected_columns, plotly_theme, max_points, x_range,
+                                                          downsample_method, webgl))
+
+
+# Clientside mode: sync for the browser's cached traces (assets/dashboard.js keeps them in IndexedDB)
+def traces_since(snapshot, version, since):
+    # The exact delta while version is still held here. Past that (a reload or return visit minutes
+    # later) the rows after since, the browser's last timestamp, since the bot only ever appends rows.
+    if version is not None:
+        delta = traces_delta(snapshot, version)
+        if delta is not None:
+            return delta
+        if since is not None:
+            df = snapshot.data
+            times = epoch_ms(df.index)
+            position = np.searchsorted(times, since)
+            if position < len(times) and times[position] == since:
+                columns = [option['value'] for option in column_options(df)]
+                return trace_delta(df.iloc[position + 1:][columns], snapshot.version, len(df), version)
+    return trace_payload(snapshot.data, snapshot.version, plotly_theme, webgl_point_threshold)
+
+
+def traces_delta(snapshot, loaded_version):
+    # Rows appended since loaded_version for every candidate trace, or None if more than that changed
+    previous = poller.get(loaded_version)
+    columns = [option['value'] for option in column_options(snapshot.data)]
+    if previous is None or previous.version != loaded_version:
+        return None
+    if columns != [option['value'] for option in column_options(previous.data)]:
+        return None
+    rows = appended_rows(previous.data, snapshot.data, columns)
+    if rows is None:
+        return None
+    return trace_delta(rows, snapshot.version, len(snapshot.data), loaded_version)
+
+
+if clientside_traces:
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='syncTraces'),
+        [Output('trace-store', 'data', allow_duplicate=True), Output('trace-version', 'data', allow_duplicate=True)],
+        Input('data-store', 'data'),  # Runs on load too, for the version embedded in the page
+        [State('trace-version', 'data'), State('trace-store', 'data'), State('trace-cache-key', 'data')],
+        prevent_initial_call='initial_duplicate'
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='mergeTraces'),
+        # data-store gets the version together with the merged traces, so syncTraces finds them current
+        [Output('trace-store', 'data'), Output('trace-version', 'data'),
+         Output('data-store', 'data', allow_duplicate=True)],
+        Input('trace-delta', 'data'),
+        [State('trace-store', 'data'), State('trace-cache-key', 'data')],
+        prevent_initial_call=True
     )
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='renderFigure'),
+        [Output('multi-axis-graph', 'figure'), Output('column-selector', 'options')],
+        [Input('column-selector', 'value'), Input('trace-store', 'data')]
+    )
+else:
+    app.callback(
+        [Output('multi-axis-graph', 'figure'),
+         Output('graph-extend', 'data'),
+         Output('column-selector', 'options'),
+         Output('figure-state', 'data')],
+        [Input('column-selector', 'value'),
+         Input('data-store', 'data'),  # Resolve the stored version to the server-side snapshot
+         Input('graph-view', 'data')],
+        State('figure-state', 'data'),
+        prevent_initial_call=True  # graph_tab renders the first figure
+    )(update_graph)
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='captureView'),
+        Output('graph-view', 'data'),
+        Input('multi-axis-graph', 'relayoutData')
+    )
+    app.clientside_callback(
+        ClientsideFunction(namespace='dashboard', function_name='extendFigure'),
+        Output('multi-axis-graph', 'extendData'),
+        Input('graph-extend', 'data')
+    )
+
 
-    return fig, options
+# Assigned last: Dash calls the function once here to validate it against the callbacks above
+app.layout = serve_layout
 
 
 if __name__ == '__main__':
-    app.run_server(port=80, debug=False, host="0.0.0.0")
+    # Development server; production serves wsgi:server through gunicorn (see gunicorn.conf.py)
+    app.run(port=int(os.environ.get("PORT", 80)), debug=False, host="0.0.0.0")
@@ -0,0 +1,4 @@
+# WSGI entry point for the production server: gunicorn --config gunicorn.conf.py wsgi:server
+from web_app_timestream_v25 import app
+
+server = app.server
@@ -115,6 +115,7 @@ resource "aws_lb" "my_alb" {
   load_balancer_type = "application"
   security_groups    = [aws_security_group.alb_security_group.id]
   subnets            = [aws_subnet.my_subnet.id, aws_subnet.my_subnet_2.id]
+  idle_timeout       = 60 # gunicorn keepalive (gunicorn.conf.py) must stay above this
 }
 
 # ALB Target Group
@@ -193,6 +194,61 @@ resource "aws_iam_policy" "ecs_timestream_policy" {
   })
 }
 
+# S3 bucket for cross-task snapshot distribution (lease + versioned snapshots)
+resource "aws_s3_bucket" "snapshot_bucket" {
+  bucket_prefix = "trading-app-snapshots-"
+  force_destroy = true
+}
+
+# Old snapshot versions are only needed for a few minutes
+resource "aws_s3_bucket_lifecycle_configuration" "snapshot_bucket_lifecycle" {
+  bucket = aws_s3_bucket.snapshot_bucket.id
+
+  rule {
+    id     = "expire-old-snapshots"
+    status = "Enabled"
+
+    filter {
+      prefix = "snapshots/snapshot-"
+    }
+
+    expiration {
+      days = 1
+    }
+  }
+}
+
+# Allow ECS tasks to read and publish snapshots
+resource "aws_iam_policy" "ecs_snapshot_bucket_policy" {
+  name        = "ecsSnapshotBucketPolicy"
+  description = "Policy to allow ECS tasks to share data snapshots through S3"
+  policy = jsonencode({
+    Version = "2012-10-17",
+    Statement = [
+      {
+        Sid       = "AllowSnapshotObjects",
+        Effect    = "Allow",
+        Action    = [
+          "s3:GetObject",
+          "s3:PutObject"
+        ],
+        Resource  = "${aws_s3_bucket.snapshot_bucket.arn}/*"
+      },
+      {
+        Sid       = "AllowSnapshotBucketList",
+        Effect    = "Allow",
+        Action    = ["s3:ListBucket"],
+        Resource  = aws_s3_bucket.snapshot_bucket.arn
+      }
+    ]
+  })
+}
+
+resource "aws_iam_role_policy_attachment" "ecs_snapshot_bucket_policy_attachment" {
+  role       = aws_iam_role.ecs_task_role.name
+  policy_arn = aws_iam_policy.ecs_snapshot_bucket_policy.arn
+}
+
 # Attach the Timestream policy to the ECS Task Role
 resource "aws_iam_role_policy_attachment" "ecs_timestream_policy_attachment" {
   role       = aws_iam_role.ecs_task_role.name
@@ -234,6 +290,13 @@ resource "aws_ecs_task_definition" "my_task_definition" {
       cpu       = 256
       memory    = 512
       essential = true
+      environment = [
+        { name = "WEB_CONCURRENCY", value = "2" },
+        { name = "GUNICORN_THREADS", value = "16" },
+        { name = "EVENTS_MAX_STREAMS", value = "12" },
+        { name = "GUNICORN_KEEPALIVE", value = "65" },
+        { name = "SNAPSHOT_BUCKET", value = aws_s3_bucket.snapshot_bucket.bucket }
+      ]
       portMappings = [
         {
           containerPort = 80
@@ -258,7 +321,7 @@ resource "aws_ecs_service" "my_service" {
   name            = "my-service"
   cluster         = aws_ecs_cluster.my_cluster.id
   task_definition = aws_ecs_task_definition.my_task_definition.arn
-  desired_count   = 1
+  desired_count   = var.desired_count # tasks share one refresher through the snapshot bucket
   launch_type     = "FARGATE"
 
   force_new_deployment = true # Ensures new tasks use the updated image
@@ -20,6 +20,12 @@ variable "image_tag" {
   type        = string
 }
 
+variable "desired_count" {
+  description = "Number of ECS tasks serving the app"
+  type        = number
+  default     = 1
+}
+
 variable "cognito_username" {
   description = "The username for app login"
   type        = string